@@ -1,5 +1,7 @@
 from sqlalchemy import (
     create_engine,
+    inspect,
+    text,
     Column,
     Integer,
     String,
@@ -8,6 +10,7 @@ from sqlalchemy import (
     DateTime,
     Text,
     Boolean,
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship, scoped_session
@@ -17,13 +20,27 @@ import threading
 from typing import Dict, Optional
 import uuid
 
+from .utils.query_stats import current_query_stats
+from .utils.session_store import SessionStore, create_session_store
+
 # Base declarative class
 Base = declarative_base()
 
 # Session-based database manager
 class DatabaseManager:
-    def __init__(self):
-        self.sessions: Dict[str, dict] = {}
+    """
+    Routes each session to the tenant database it selected.
+
+    The session -> database mapping lives in a SessionStore, which can be
+    shared by several worker processes (TABBLE_SESSION_STORE=sqlite). The
+    engine and session factory of each database are created once per
+    process and shared by all of its sessions; every request gets its own
+    Session from the factory (see get_session_db).
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store or create_session_store()
+        self.connections: Dict[str, dict] = {}  # Database name -> engine and session factory
         self.lock = threading.Lock()
         self.default_database = "tabble_new.db"
 
@@ -35,43 +52,46 @@ class DatabaseManager:
         return session_id
 
     def get_database_connection(self, session_id: str, database_name: Optional[str] = None) -> dict:
-        """Get or create database connection for session"""
-        with self.lock:
-            if session_id not in self.sessions:
-                # Create new session with default database
-                db_name = database_name or self.default_database
-                self.sessions[session_id] = self._create_connection(db_name)
-            elif database_name and self.sessions[session_id]['database_name'] != database_name:
-                # Switch database for existing session
-                self._dispose_connection(session_id)
-                self.sessions[session_id] = self._create_connection(database_name)
-
-            return self.sessions[session_id]
+        """Get the connection of the session's database, switching the session to database_name if given"""
+        if database_name:
+            connection = self.get_connection(database_name)
+            self.store.set(session_id, database_name)
+        else:
+            connection = self.get_connection(self.store.get(session_id) or self.default_database)
+
+        # Attribute the request to its tenant even if it never reaches the database
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.tenant = connection['database_name']
+        return connection
+
+    def get_connection(self, database_name: str) -> dict:
+        """Get or create the shared connection of a database"""
+        connection = self.connections.get(database_name)
+        if connection is None:
+            with self.lock:
+                connection = self.connections.get(database_name)
+                if connection is None:
+                    connection = self.connections[database_name] = self._create_connection(database_name)
+        return connection
 
     def _create_connection(self, database_name: str) -> dict:
         """Create a new database connection"""
         database_url = f"sqlite:///./tabble_new.db" if database_name == "tabble_new.db" else f"sqlite:///./{database_name}"
         engine = create_engine(database_url, connect_args={"check_same_thread": False})
         session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        session_local = scoped_session(session_factory)
 
         # Create tables in the database if they don't exist
         Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
 
         return {
             'database_name': database_name,
             'database_url': database_url,
             'engine': engine,
-            'session_local': session_local
+            'session_factory': session_factory
         }
 
-    def _dispose_connection(self, session_id: str):
-        """Dispose of database connection for session"""
-        if session_id in self.sessions:
-            connection = self.sessions[session_id]
-            connection['session_local'].remove()
-            connection['engine'].dispose()
-
     def switch_database(self, session_id: str, database_name: str) -> bool:
         """Switch database for a specific session"""
         try:
@@ -84,16 +104,11 @@ class DatabaseManager:
 
     def get_current_database(self, session_id: str) -> str:
         """Get current database name for session"""
-        if session_id in self.sessions:
-            return self.sessions[session_id]['database_name']
-        return self.default_database
+        return self.store.get(session_id) or self.default_database
 
     def cleanup_session(self, session_id: str):
-        """Clean up session resources"""
-        with self.lock:
-            if session_id in self.sessions:
-                self._dispose_connection(session_id)
-                del self.sessions[session_id]
+        """Forget a session; its database stays open for the other sessions"""
+        self.store.delete(session_id)
 
 # Global database manager instance
 db_manager = DatabaseManager()
@@ -120,6 +135,8 @@ class Dish(Base):
     price = Column(Float)
     quantity = Column(Integer, default=0)
     image_path = Column(String, nullable=True)
+    image_hash = Column(String, nullable=True)  # sha256 of the stored image file
+    image_variants = Column(Text, nullable=True)  # JSON: variant name -> URL of resized copies
     discount = Column(Float, default=0)  # Discount amount (percentage)
     is_offer = Column(Integer, default=0)  # 0 = not an offer, 1 = is an offer
     is_special = Column(Integer, default=0)  # 0 = not special, 1 = today's special
@@ -143,6 +160,8 @@ class Order(Base):
     unique_id = Column(String, index=True)
     person_id = Column(Integer, ForeignKey("persons.id"), nullable=True)
     status = Column(String, default="pending")  # pending, accepted, completed, paid
+    total_amount = Column(Float, default=0)  # Sum of unit_price * quantity, maintained on write
+    item_count = Column(Integer, default=0)  # Sum of item quantities, maintained on write
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -154,6 +173,28 @@ class Order(Base):
     items = relationship("OrderItem", back_populates="order")
     person = relationship("Person", back_populates="orders")
 
+    __table_args__ = (
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_updated_at", "updated_at"),
+    )
+
+
+class OrderEvent(Base):
+    __tablename__ = "order_events"
+
+    # Append-only log of order status transitions. No foreign key on order_id
+    # so the history survives order deletion (e.g. the source of a merge).
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)  # status the order moved into
+    person_id = Column(Integer, nullable=True)  # owner of a removed order, to scope per-person deltas
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        Index("ix_order_events_order_id_created_at", "order_id", "created_at"),
+        Index("ix_order_events_created_at", "created_at"),
+    )
+
 
 class Person(Base):
     __tablename__ = "persons"
@@ -177,6 +218,7 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     dish_id = Column(Integer, ForeignKey("dishes.id"))
     quantity = Column(Integer, default=1)
+    unit_price = Column(Float, nullable=True)  # Dish price captured when the item was ordered
     remarks = Column(Text, nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -184,6 +226,10 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
     dish = relationship("Dish", back_populates="order_items")
 
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+    )
+
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -252,6 +298,10 @@ class Table(Base):
     # Relationship to current order
     current_order = relationship("Order", foreign_keys=[current_order_id])
 
+    __table_args__ = (
+        Index("ix_tables_updated_at", "updated_at"),
+    )
+
 
 class Settings(Base):
     __tablename__ = "settings"
@@ -263,6 +313,7 @@ class Settings(Base):
     email = Column(String, nullable=True)
     tax_id = Column(String, nullable=True)
     logo_path = Column(String, nullable=True)
+    logo_hash = Column(String, nullable=True)  # sha256 of the stored logo file
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -307,9 +358,77 @@ def get_current_database():
 def create_tables():
     # Create all tables (only creates tables that don't exist)
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     print("Database tables created/verified successfully")
 
 
+# Bring an existing database up to date with the models
+def upgrade_schema(bind) -> list:
+    """
+    Add columns and indexes that were introduced after a database was created.
+
+    create_all() only creates missing tables, so databases created by older
+    versions (or by create_empty_db.py) are patched here with ALTER TABLE.
+    Returns the list of "table.column" names that were added.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added_columns = []
+
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                added_columns.append(f"{table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+
+        # Orders created before totals were denormalized need a one-off backfill
+        if "orders.total_amount" in added_columns or "order_items.unit_price" in added_columns:
+            backfill_order_totals(connection)
+
+    if added_columns:
+        print(f"Database schema upgraded, added columns: {', '.join(added_columns)}")
+
+    return added_columns
+
+
+def backfill_order_totals(connection) -> int:
+    """
+    Fill order_items.unit_price and orders.total_amount/item_count for rows
+    written before they were maintained at write time.
+
+    Items without a captured price fall back to the dish's current price.
+    Returns the number of orders whose totals were recomputed.
+    """
+    connection.execute(text(
+        "UPDATE order_items SET unit_price = "
+        "(SELECT dishes.price FROM dishes WHERE dishes.id = order_items.dish_id) "
+        "WHERE unit_price IS NULL"
+    ))
+    result = connection.execute(text(
+        "UPDATE orders SET "
+        "total_amount = COALESCE((SELECT SUM(COALESCE(order_items.unit_price, 0) * order_items.quantity) "
+        "FROM order_items WHERE order_items.order_id = orders.id), 0), "
+        "item_count = COALESCE((SELECT SUM(order_items.quantity) "
+        "FROM order_items WHERE order_items.order_id = orders.id), 0) "
+        "WHERE status != 'cancelled'"
+    ))
+    connection.execute(text(
+        "UPDATE orders SET total_amount = 0, item_count = 0 "
+        "WHERE status = 'cancelled' AND (total_amount IS NULL OR item_count IS NULL)"
+    ))
+    return result.rowcount
+
+
 # Get database session (legacy)
 def get_db():
     db = SessionLocal()
@@ -321,9 +440,15 @@ def get_db():
 
 # Session-aware database functions
 def get_session_db(session_id: str, database_name: Optional[str] = None):
-    """Get database session for a specific session ID"""
+    """
+    Yield a new database session on the session ID's database, closed when the caller is done.
+
+    Use it as a FastAPI yield dependency (`yield from get_session_db(...)`):
+    the session then lives exactly as long as the request, which may run on
+    any threadpool thread, and returns its connection to the pool afterwards.
+    """
     connection = db_manager.get_database_connection(session_id, database_name)
-    db = connection['session_local']()
+    db = connection['session_factory']()
     try:
         yield db
     finally:
@@ -335,6 +460,11 @@ def switch_session_database(session_id: str, database_name: str) -> bool:
     return db_manager.switch_database(session_id, database_name)
 
 
+def get_session_engine(session_id: str):
+    """Get the engine of a session's database, for work outside a request-scoped session"""
+    return db_manager.get_database_connection(session_id)['engine']
+
+
 def get_session_current_database(session_id: str) -> str:
     """Get current database name for a session"""
     return db_manager.get_current_database(session_id)
@@ -1,5 +1,6 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends
-from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,12 +8,48 @@ from sqlalchemy.orm import Session
 import uvicorn
 import os
 
+from . import database
 from .database import get_db, create_tables
-from .routers import chef, customer, admin, feedback, loyalty, selection_offer, table, analytics, settings
-from .middleware import SessionMiddleware
+from .routers import chef, customer, admin, feedback, loyalty, selection_offer, table, analytics, settings, metrics, profiler, health
+from .middleware import SessionMiddleware, CompressionMiddleware, QueryTimingMiddleware, ProfilerMiddleware
+from .utils.render_pool import bill_render_pool
+from .utils.image_variants import image_variant_worker
+from .utils.static_files import CachedStaticFiles
+from .utils.invalidation import cache_bus
+from .services.warm_up import tenant_warm_up, WARM_UP_TIMEOUT
+
+# Warm each worker up before it serves traffic (set by `run.py --production`)
+WARM_UP = os.getenv("TABBLE_WARM_UP", "0") == "1"
+
+
+def warm_up_worker():
+    """Pay one-off startup costs now instead of in the first requests"""
+    # Spawn the bill render processes, which import ReportLab
+    bill_render_pool.warm_up()
+    # Open the default database's first pooled connection
+    with database.engine.connect():
+        pass
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create or upgrade the default database's tables before serving
+    create_tables()
+    if WARM_UP:
+        warm_up_worker()
+        # Open every hotel and fill its caches; serve once done or after the
+        # timeout, leaving the rest to finish while /health/ready says 503
+        tenant_warm_up.start()
+        await run_in_threadpool(tenant_warm_up.wait, WARM_UP_TIMEOUT)
+    yield
+    # Let pending image variants finish writing, then stop the render workers
+    image_variant_worker.shutdown()
+    bill_render_pool.shutdown()
+    cache_bus.stop()
+
 
 # Create FastAPI app
-app = FastAPI(title="Tabble - Hotel Management App")
+app = FastAPI(title="Tabble - Hotel Management App", lifespan=lifespan)
 
 # Add CORS middleware to allow cross-origin requests
 app.add_middleware(
@@ -21,18 +58,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Sync-Cursor", "Server-Timing", "X-Profile-Id"],  # Delta sync cursor, DB timing, request profiles
 )
 
 # Add session middleware for database management
 app.add_middleware(SessionMiddleware, require_database=True)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Compress JSON/text responses (after the other middleware, so it sees the final response)
+app.add_middleware(CompressionMiddleware)
+
+# Sample requests sent with the X-Profile header (only when TABBLE_PROFILER_TOKEN is set)
+app.add_middleware(ProfilerMiddleware)
+
+# Count queries and DB time per request for Server-Timing and the request log (outermost)
+app.add_middleware(QueryTimingMiddleware)
+
+# Mount static files (uploads are content-hashed and cached as immutable)
+app.mount("/static", CachedStaticFiles(directory="app/static"), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
 # Include routers
+app.include_router(profiler.router)
 app.include_router(chef.router)
 app.include_router(customer.router)
 app.include_router(admin.router)
@@ -42,17 +90,17 @@ app.include_router(selection_offer.router)
 app.include_router(table.router)
 app.include_router(analytics.router)
 app.include_router(settings.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
 
-# Create database tables
-create_tables()
 
 # Check if we have the React build folder
 react_build_dir = "frontend/build"
 has_react_build = os.path.isdir(react_build_dir)
 
 if has_react_build:
-    # Mount the React build folder
-    app.mount("/", StaticFiles(directory=react_build_dir, html=True), name="react")
+    # Mount the React build folder, serving precompressed .br/.gz bundles when present
+    app.mount("/", CachedStaticFiles(directory=react_build_dir, html=True), name="react")
 
 
 # Root route - serve React app in production, otherwise serve index.html template
@@ -127,4 +175,5 @@ async def dish_analysis_page(request: Request):
 
 
 if __name__ == "__main__":
+    # Development server; `python run.py --production` serves real traffic
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
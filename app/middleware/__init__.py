@@ -1,3 +1,6 @@
 from .session_middleware import SessionMiddleware, get_session_id
+from .compression_middleware import CompressionMiddleware
+from .timing_middleware import QueryTimingMiddleware, route_template
+from .profiler_middleware import ProfilerMiddleware
 
-__all__ = ['SessionMiddleware', 'get_session_id']
+__all__ = ['SessionMiddleware', 'get_session_id', 'CompressionMiddleware', 'QueryTimingMiddleware', 'route_template', 'ProfilerMiddleware']
@@ -0,0 +1,124 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.compression import (
+    COMPRESS_MIN_SIZE, StreamCompressor, choose_encoding, compress, is_compressible,
+)
+
+# Bodies above this size are compressed in the thread pool instead of on the event loop
+THREADPOOL_COMPRESS_SIZE = 64 * 1024
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli (when installed) or gzip.
+
+    Only responses with a compressible content type and a body of at least
+    minimum_size bytes are compressed. Responses that already carry a
+    Content-Encoding (precompressed static files, cached menu payloads) are
+    passed through untouched. Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.pending = []  # Body chunks held back until the size is known
+        self.pending_size = 0
+        self.passthrough = False
+        self.stream = None
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.downstream(message)
+            else:
+                # Held back until enough of the body shows whether to compress
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        # Responses passing through BaseHTTPMiddleware arrive as chunks even
+        # when they are complete, so buffer up to minimum_size before deciding
+        self.pending.append(body)
+        self.pending_size += len(body)
+        if more_body and self.pending_size < self.minimum_size:
+            return
+
+        start, self.start_message = self.start_message, None
+        body = b"".join(self.pending)
+        self.pending = []
+        headers = MutableHeaders(raw=start["headers"])
+
+        if not more_body:
+            # Whole body known
+            if len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.downstream(start)
+                await self.downstream({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            if len(body) > THREADPOOL_COMPRESS_SIZE:
+                body = await run_in_threadpool(compress, body, self.encoding)
+            else:
+                body = compress(body, self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await self.downstream(start)
+            await self.downstream({"type": "http.response.body", "body": body, "more_body": False})
+            return
+
+        # Streamed body: compress incrementally, length is unknown upfront
+        self.stream = StreamCompressor(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self.downstream(start)
+        await self._send_compressed(body, more_body)
+
+    async def _send_compressed(self, body: bytes, more_body: bool):
+        if len(body) > THREADPOOL_COMPRESS_SIZE:
+            data = await run_in_threadpool(self.stream.compress, body)
+        else:
+            data = self.stream.compress(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        await self.downstream({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,69 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.profiler import StackSampler, collapsed, request_profiles, token_matches, PROFILER_TOKEN
+from .timing_middleware import route_template
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilerMiddleware:
+    """
+    Profile single requests on demand.
+
+    A request sent with "X-Profile: <TABBLE_PROFILER_TOKEN>" is sampled
+    for as long as it runs and answered with an X-Profile-Id header; the
+    collapsed stacks are then available from /admin/profiler/requests/{id}.
+    The sampler sees every thread, so requests served at the same time
+    show up in the profile too. Without the header the request passes
+    straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not PROFILER_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        token = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if token is None or not token_matches(token.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        # A handful of concurrent profiles at most; the rest run unprofiled
+        if not request_profiles.slots.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = request_profiles.new_id()
+        status = 500
+
+        async def send_with_profile_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(raw=message["headers"]).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        sampler = StackSampler()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            samples = sampler.stop()
+            request_profiles.slots.release()
+            request_profiles.add(profile_id, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "samples": sampler.sample_count,
+                "created_at": time.time(),
+            }, collapsed(samples))
@@ -1,5 +1,6 @@
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import JSONResponse
 import uuid
 from typing import Callable
@@ -65,8 +66,9 @@ class SessionMiddleware(BaseHTTPMiddleware):
         )
         
         if should_validate:
-            # Check if session has a valid database connection
-            current_db = db_manager.get_current_database(session_id)
+            # Check if session has a valid database connection (the session
+            # store may be a SQLite file, so look it up off the event loop)
+            current_db = await run_in_threadpool(db_manager.get_current_database, session_id)
             if not current_db or current_db == db_manager.default_database:
                 # Check if there's a stored database in headers
                 stored_database = request.headers.get('x-database-name')
@@ -87,7 +89,7 @@ class SessionMiddleware(BaseHTTPMiddleware):
                                     if (row["hotel_database"] == stored_database and 
                                         row["password"] == stored_password):
                                         # Valid credentials, switch database
-                                        db_manager.switch_database(session_id, stored_database)
+                                        await run_in_threadpool(db_manager.switch_database, session_id, stored_database)
                                         break
                                 else:
                                     # Invalid credentials
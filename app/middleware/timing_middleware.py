@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.metrics import Counter, Gauge, Histogram
+from ..utils.query_stats import QueryStats, current_query_stats, logger
+
+# One structured log line per request; set to 0 to only keep Server-Timing
+REQUEST_LOG = os.getenv("TABBLE_REQUEST_LOG", "1") != "0"
+
+_route_paths = {}
+
+REQUEST_SECONDS = Histogram(
+    "tabble_http_request_duration_seconds", "Time to serve a request, by route and tenant",
+    ["method", "route", "tenant"],
+)
+RESPONSES = Counter("tabble_http_responses_total", "Responses sent, by route and status", ["method", "route", "status"])
+IN_FLIGHT = Gauge("tabble_http_requests_in_flight", "Requests currently being served")
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The path template of the route that handled a request ("/chef/orders/{order_id}/accept").
+
+    Keeps ids out of log and metric labels. Available once routing has run;
+    requests that matched nothing are reported as "unmatched".
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in _route_paths:
+        for route in scope["app"].routes:
+            if isinstance(route, Mount):
+                _route_paths[route.app] = (route.path or "") + "/{path}"
+            elif hasattr(route, "endpoint"):
+                _route_paths[route.endpoint] = route.path
+    return _route_paths.get(endpoint, "unmatched")
+
+
+class QueryTimingMiddleware:
+    """
+    Count SQL statements and database time per request.
+
+    Adds a Server-Timing header (db and total time, with the query count)
+    and, unless TABBLE_REQUEST_LOG=0, logs one JSON line per request with
+    the route, tenant, status, query count, db ms and total ms. The header
+    is written when the response starts, so for streamed responses it only
+    covers the work done before the first byte. The request duration also
+    feeds the latency histogram and response counter served on /metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope["path"])
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        IN_FLIGHT.inc()
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"total;dur={total_ms:.1f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            IN_FLIGHT.dec()
+            total_seconds = time.perf_counter() - start
+            method, route, tenant = scope["method"], route_template(scope), stats.tenant or ""
+            REQUEST_SECONDS.observe(total_seconds, method, route, tenant)
+            RESPONSES.inc(method, route, str(status))
+            if REQUEST_LOG:
+                logger.info(json.dumps({
+                    "event": "request",
+                    "method": method,
+                    "route": route,
+                    "status": status,
+                    "tenant": tenant or None,
+                    "queries": stats.queries,
+                    "db_ms": round(stats.db_seconds * 1000, 2),
+                    "total_ms": round(total_seconds * 1000, 2),
+                }))
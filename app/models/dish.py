@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from typing import Dict, Optional
 from datetime import datetime
+import json
 
 class DishBase(BaseModel):
     name: str
@@ -31,9 +32,19 @@ class DishUpdate(DishBase):
 class Dish(DishBase):
     id: int
     image_path: Optional[str] = None
+    image_hash: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None  # e.g. thumbnail, thumbnail_webp, medium, medium_webp
     visibility: int = 1
     created_at: datetime
     updated_at: datetime
 
+    # Stored as JSON text in the database
+    @field_validator("image_variants", mode="before")
+    @classmethod
+    def parse_image_variants(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
     class Config:
         from_attributes = True  # Updated from orm_mode for Pydantic V2
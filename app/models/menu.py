@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+from .dish import Dish
+from .loyalty import LoyaltyProgram
+from .selection_offer import SelectionOffer
+from .settings import Settings
+
+
+class MenuBootstrap(BaseModel):
+    """Everything the customer menu page needs for its first render"""
+    version: str
+    menu: List[Dish]
+    categories: List[str]
+    specials: List[Dish]
+    offers: List[Dish]
+    settings: Optional[Settings] = None
+    loyalty_tiers: List[LoyaltyProgram]
+    selection_offers: List[SelectionOffer]
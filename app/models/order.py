@@ -17,6 +17,7 @@ class OrderItemCreate(OrderItemBase):
 class OrderItem(OrderItemBase):
     id: int
     order_id: int
+    unit_price: Optional[float] = None
     created_at: datetime
     dish: Optional[Dish] = None
 
@@ -49,6 +50,8 @@ class OrderUpdate(BaseModel):
 class Order(OrderBase):
     id: int
     status: str
+    total_amount: Optional[float] = 0
+    item_count: Optional[int] = 0
     created_at: datetime
     updated_at: datetime
     items: List[OrderItem] = []
@@ -58,3 +61,10 @@ class Order(OrderBase):
 
     class Config:
         from_attributes = True  # Updated from orm_mode for Pydantic V2
+
+
+class OrderDelta(BaseModel):
+    """Orders changed since a sync cursor, and ids that left the list"""
+    cursor: str
+    changed: List[Order] = []
+    removed: List[int] = []
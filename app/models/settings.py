@@ -27,6 +27,7 @@ class SettingsUpdate(BaseModel):
 
 class Settings(SettingsBase):
     id: int
+    logo_hash: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -27,6 +27,13 @@ class Table(TableBase):
         from_attributes = True  # Updated from orm_mode for Pydantic V2
 
 
+class TableDelta(BaseModel):
+    """Tables changed since a sync cursor"""
+    cursor: str
+    changed: List[Table] = []
+    removed: List[int] = []
+
+
 class TableStatus(BaseModel):
     total_tables: int
     occupied_tables: int
@@ -1,16 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 import os
-import shutil
 from datetime import datetime, timezone
-from ..utils.pdf_generator import generate_bill_pdf, generate_multi_order_bill_pdf
+from ..utils.pdf_generator import build_bill
+from ..utils.render_pool import bill_render_pool, render_bill_pdf_pooled, RenderQueueFull, RenderTimeout
+from ..utils.receipt_renderer import render_bill_text, render_bill_escpos
 
 from ..database import get_db, Order, Dish, OrderItem, Person, Settings, get_session_db, get_session_current_database
-from ..models.order import Order as OrderModel
+from ..models.order import Order as OrderModel, OrderDelta
 from ..models.dish import Dish as DishModel, DishCreate, DishUpdate
 from ..middleware import get_session_id
+from ..services.order_events import record_order_event
+from ..services.bills import load_order_snapshots, get_bill_settings
+from ..services.exports import stream_orders_export
+from ..utils.uploads import save_image_upload
+from ..utils.image_variants import image_variant_worker
+from ..services.menu import invalidate_menu
+from ..services.order_rows import load_order_rows
+from ..services.sync import CURSOR_HEADER, new_cursor, order_delta
+from ..utils.serialization import ModelListResponse, ModelResponse, column_rows
 
 router = APIRouter(
     prefix="/admin",
@@ -22,37 +32,114 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
-# Get all orders with customer information
-@router.get("/orders", response_model=List[OrderModel])
-def get_all_orders(request: Request, status: str = None, db: Session = Depends(get_session_database)):
-    query = db.query(Order)
+# Order export formats and their media types
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
-    if status:
-        query = query.filter(Order.status == status)
+
+# Supported bill formats: pdf (ReportLab), text (fixed width) and escpos (thermal printer bytes)
+BILL_FORMATS = {"pdf", "text", "escpos"}
+
+
+def validate_bill_format(format: str):
+    if format not in BILL_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported bill format '{format}'. Use one of: {', '.join(sorted(BILL_FORMATS))}"
+        )
+
+
+# Render a bill in the requested format as a downloadable file
+def render_bill_response(bill: dict, filename: str, format: str) -> Response:
+    if format == "text":
+        # Fixed-width receipts are cheap enough to render in the request thread
+        content = render_bill_text(bill)
+        media_type = "text/plain"  # Starlette appends "; charset=utf-8"
+        extension = "txt"
+    elif format == "escpos":
+        content = render_bill_escpos(bill)
+        media_type = "application/octet-stream"
+        extension = "bin"
+    else:
+        # PDFs go through the render pool, mapping pool back-pressure to HTTP errors
+        try:
+            content = render_bill_pdf_pooled(bill)
+        except RenderQueueFull:
+            raise HTTPException(status_code=503, detail="Bill printer is busy, please retry shortly")
+        except RenderTimeout:
+            raise HTTPException(status_code=504, detail="Bill generation timed out")
+        media_type = "application/pdf"
+        extension = "pdf"
+
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"}
+    )
+
+
+# Get all orders with customer information, or only the changes since a cursor
+@router.get("/orders", response_model=Union[List[OrderModel], OrderDelta])
+def get_all_orders(request: Request, status: str = None, since: str = None, db: Session = Depends(get_session_database)):
+    membership = [Order.status == status] if status else []
+
+    if since:
+        # Only orders changed after the cursor, and ids that left the list
+        query = db.query(Order).order_by(Order.created_at.desc())
+        delta = order_delta(db, query, since, *membership, with_person=True)
+        return ModelResponse(OrderDelta, delta)
+
+    cursor = new_cursor()
+    query = db.query(Order).filter(*membership)
 
     # Order by most recent first
-    orders = query.order_by(Order.created_at.desc()).all()
+    query = query.order_by(Order.created_at.desc())
+
+    # Orders with person, items and dishes in a fixed number of queries, serialized without ORM objects
+    rows = load_order_rows(db, query, with_person=True)
+    return ModelListResponse(OrderModel, rows, headers={CURSOR_HEADER: cursor})
 
-    # Load person information for each order
-    for order in orders:
-        if order.person_id:
-            person = db.query(Person).filter(Person.id == order.person_id).first()
-            if person:
-                # Add person information to the order
-                order.person_name = person.username
-                order.visit_count = person.visit_count
 
-        # Load dish information for each order item
-        for item in order.items:
-            if not hasattr(item, "dish") or item.dish is None:
-                dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
-                if dish:
-                    item.dish = dish
+# Stream all orders with their items as NDJSON or CSV, optionally gzipped
+@router.get("/orders/export")
+def export_orders(
+    request: Request,
+    format: str = "ndjson",
+    start_date: str = None,
+    end_date: str = None,
+    status: str = None,
+    gzip: bool = False,
+    db: Session = Depends(get_session_database),
+):
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid export format. Use 'ndjson' or 'csv'")
+
+    # Parse date range (ISO format, on order creation time)
+    start_datetime = None
+    end_datetime = None
+    try:
+        if start_date:
+            start_datetime = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+        if end_date:
+            end_datetime = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)")
+
+    # The body is produced on its own connection after this function returns
+    engine = db.get_bind()
+    filename = f"orders_{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}{'.gz' if gzip else ''}"}
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        media_type = "application/gzip"
 
-    return orders
+    return StreamingResponse(
+        stream_orders_export(engine, format, start_datetime, end_datetime, status, compress=gzip),
+        media_type=media_type,
+        headers=headers,
+    )
 
 
 # Get all dishes (only visible ones)
@@ -71,22 +158,21 @@ def get_all_dishes(
     if is_special is not None:
         query = query.filter(Dish.is_special == is_special)
 
-    dishes = query.all()
-    return dishes
+    return ModelListResponse(DishModel, column_rows(query, Dish, DishModel))
 
 
 # Get offer dishes (only visible ones)
 @router.get("/api/offers", response_model=List[DishModel])
 def get_offer_dishes(request: Request, db: Session = Depends(get_session_database)):
-    dishes = db.query(Dish).filter(Dish.is_offer == 1, Dish.visibility == 1).all()
-    return dishes
+    query = db.query(Dish).filter(Dish.is_offer == 1, Dish.visibility == 1)
+    return ModelListResponse(DishModel, column_rows(query, Dish, DishModel))
 
 
 # Get special dishes (only visible ones)
 @router.get("/api/specials", response_model=List[DishModel])
 def get_special_dishes(request: Request, db: Session = Depends(get_session_database)):
-    dishes = db.query(Dish).filter(Dish.is_special == 1, Dish.visibility == 1).all()
-    return dishes
+    query = db.query(Dish).filter(Dish.is_special == 1, Dish.visibility == 1)
+    return ModelListResponse(DishModel, column_rows(query, Dish, DishModel))
 
 
 # Get dish by ID (only if visible)
@@ -118,6 +204,13 @@ def create_category(request: Request, category_name: str = Form(...), db: Sessio
     return {"message": "Category created successfully", "category": category_name}
 
 
+# Store a dish image under app/static/images/dishes/{db_name}, named by content hash
+async def save_dish_image(request: Request, image: UploadFile):
+    session_id = get_session_id(request)
+    current_db = get_session_current_database(session_id)
+    return await save_image_upload(image, f"images/dishes/{current_db}")
+
+
 # Create new dish
 @router.post("/api/dishes", response_model=DishModel)
 async def create_dish(
@@ -149,30 +242,21 @@ async def create_dish(
         is_special=is_special,
     )
 
+    # Handle image upload if provided, before saving so a rejected upload creates nothing
+    if image:
+        stored = await save_dish_image(request, image)
+        db_dish.image_path = stored.url
+        db_dish.image_hash = stored.sha256
+
     # Save dish to database
     db.add(db_dish)
     db.commit()
     db.refresh(db_dish)
+    invalidate_menu(db)
 
-    # Handle image upload if provided
+    # Thumbnails and WebP copies are generated in the background
     if image:
-        # Get current database name for organizing images
-        session_id = get_session_id(request)
-        current_db = get_session_current_database(session_id)
-
-        # Create directory structure: app/static/images/dishes/{db_name}
-        db_images_dir = f"app/static/images/dishes/{current_db}"
-        os.makedirs(db_images_dir, exist_ok=True)
-
-        # Save image with database-specific path
-        image_path = f"{db_images_dir}/{db_dish.id}_{image.filename}"
-        with open(image_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-
-        # Update dish with image path (URL path for serving)
-        db_dish.image_path = f"/static/images/dishes/{current_db}/{db_dish.id}_{image.filename}"
-        db.commit()
-        db.refresh(db_dish)
+        image_variant_worker.schedule_dish(db.get_bind(), db_dish.id, db_dish.image_path)
 
     return db_dish
 
@@ -221,21 +305,10 @@ async def update_dish(
 
     # Handle image upload if provided
     if image:
-        # Get current database name for organizing images
-        session_id = get_session_id(request)
-        current_db = get_session_current_database(session_id)
-
-        # Create directory structure: app/static/images/dishes/{db_name}
-        db_images_dir = f"app/static/images/dishes/{current_db}"
-        os.makedirs(db_images_dir, exist_ok=True)
-
-        # Save image with database-specific path
-        image_path = f"{db_images_dir}/{db_dish.id}_{image.filename}"
-        with open(image_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-
-        # Update dish with image path (URL path for serving)
-        db_dish.image_path = f"/static/images/dishes/{current_db}/{db_dish.id}_{image.filename}"
+        stored = await save_dish_image(request, image)
+        db_dish.image_path = stored.url
+        db_dish.image_hash = stored.sha256
+        db_dish.image_variants = None
 
     # Update timestamp
     db_dish.updated_at = datetime.now(timezone.utc)
@@ -243,6 +316,10 @@ async def update_dish(
     # Save changes
     db.commit()
     db.refresh(db_dish)
+    invalidate_menu(db)
+
+    if image:
+        image_variant_worker.schedule_dish(db.get_bind(), db_dish.id, db_dish.image_path)
 
     return db_dish
 
@@ -258,6 +335,7 @@ def delete_dish(dish_id: int, request: Request, db: Session = Depends(get_sessio
     db_dish.visibility = 0
     db_dish.updated_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_menu(db)
 
     return {"message": "Dish deleted successfully"}
 
@@ -330,117 +408,52 @@ def mark_order_paid(order_id: int, request: Request, db: Session = Depends(get_s
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Allow marking as paid from any status
+    current_time = datetime.now(timezone.utc)
     db_order.status = "paid"
-    db_order.updated_at = datetime.now(timezone.utc)
+    db_order.updated_at = current_time
+    record_order_event(db, db_order.id, "paid", current_time)
 
     db.commit()
 
     return {"message": "Order marked as paid"}
 
 
-# Generate bill PDF for a single order
+# Generate bill (PDF, plain text or ESC/POS) for a single order
 @router.get("/orders/{order_id}/bill")
-def generate_bill(order_id: int, request: Request, db: Session = Depends(get_session_database)):
-    # Get order with all details
-    db_order = db.query(Order).filter(Order.id == order_id).first()
-    if db_order is None:
-        raise HTTPException(status_code=404, detail="Order not found")
-
-    # Load person information if available
-    if db_order.person_id:
-        person = db.query(Person).filter(Person.id == db_order.person_id).first()
-        if person:
-            db_order.person_name = person.username
-
-    # Load dish information for each order item
-    for item in db_order.items:
-        if not hasattr(item, "dish") or item.dish is None:
-            dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
-            if dish:
-                item.dish = dish
-
-    # Get hotel settings
-    settings = db.query(Settings).first()
-    if not settings:
-        # Create default settings if none exist
-        settings = Settings(
-            hotel_name="Tabble Hotel",
-            address="123 Main Street, City",
-            contact_number="+1 123-456-7890",
-            email="info@tabblehotel.com",
-        )
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
+def generate_bill(order_id: int, request: Request, format: str = "pdf", db: Session = Depends(get_session_database)):
+    validate_bill_format(format)
 
-    # Generate PDF
-    pdf_buffer = generate_bill_pdf(db_order, settings)
+    # Snapshot to plain data so rendering can happen in another process
+    bill = build_bill(load_order_snapshots(db, [order_id]), get_bill_settings(db))
 
     # Return PDF as a downloadable file
-    filename = f"bill_order_{order_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
+    filename = f"bill_order_{order_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return render_bill_response(bill, filename, format)
 
 
-# Generate bill PDF for multiple orders
+# Generate bill (PDF, plain text or ESC/POS) for multiple orders
 @router.post("/orders/multi-bill")
-def generate_multi_bill(order_ids: List[int], request: Request, db: Session = Depends(get_session_database)):
+def generate_multi_bill(order_ids: List[int], request: Request, format: str = "pdf", db: Session = Depends(get_session_database)):
+    validate_bill_format(format)
+
     if not order_ids:
         raise HTTPException(status_code=400, detail="No order IDs provided")
 
-    orders = []
-
-    # Get all orders with details
-    for order_id in order_ids:
-        db_order = db.query(Order).filter(Order.id == order_id).first()
-        if db_order is None:
-            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
-
-        # Load person information if available
-        if db_order.person_id:
-            person = db.query(Person).filter(Person.id == db_order.person_id).first()
-            if person:
-                db_order.person_name = person.username
-
-        # Load dish information for each order item
-        for item in db_order.items:
-            if not hasattr(item, "dish") or item.dish is None:
-                dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
-                if dish:
-                    item.dish = dish
-
-        orders.append(db_order)
-
-    # Get hotel settings
-    settings = db.query(Settings).first()
-    if not settings:
-        # Create default settings if none exist
-        settings = Settings(
-            hotel_name="Tabble Hotel",
-            address="123 Main Street, City",
-            contact_number="+1 123-456-7890",
-            email="info@tabblehotel.com",
-        )
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
-
-    # Generate PDF for multiple orders
-    pdf_buffer = generate_multi_order_bill_pdf(orders, settings)
+    # Orders, items, dishes and persons are loaded in bulk, not per order
+    bill = build_bill(load_order_snapshots(db, order_ids), get_bill_settings(db))
 
     # Create a filename with all order IDs
     order_ids_str = "-".join([str(order_id) for order_id in order_ids])
-    filename = f"bill_orders_{order_ids_str}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
+    filename = f"bill_orders_{order_ids_str}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return render_bill_response(bill, filename, format)
+
+
+# Get bill render pool queue depth and timings
+@router.get("/bill-render/stats")
+def get_bill_render_stats(request: Request):
+    return bill_render_pool.stats()
 
 
 # Merge two orders
@@ -465,12 +478,21 @@ def merge_orders(source_order_id: int, target_order_id: int, request: Request, d
         raise HTTPException(status_code=400, detail=f"Target order must be completed or paid, current status: {target_order.status}")
 
     # Move all items from source order to target order
-    for item in source_order.items:
-        # Update the order_id to point to the target order
-        item.order_id = target_order.id
+    for item in list(source_order.items):
+        # Reassign through the relationship so the item leaves source_order.items;
+        # otherwise deleting the source order would null out its order_id
+        item.order = target_order
+
+    # Carry the source order's totals over to the target order
+    target_order.total_amount = (target_order.total_amount or 0) + (source_order.total_amount or 0)
+    target_order.item_count = (target_order.item_count or 0) + (source_order.item_count or 0)
 
     # Update the target order's updated_at timestamp
-    target_order.updated_at = datetime.now(timezone.utc)
+    current_time = datetime.now(timezone.utc)
+    target_order.updated_at = current_time
+
+    # The source order disappears, so close its history with a merge event
+    record_order_event(db, source_order.id, "merged", current_time, person_id=source_order.person_id)
 
     # Delete the source order (but keep its items which now belong to the target order)
     db.delete(source_order)
@@ -488,22 +510,6 @@ def merge_orders(source_order_id: int, target_order_id: int, request: Request, d
 @router.get("/orders/completed-for-billing", response_model=List[OrderModel])
 def get_completed_orders_for_billing(request: Request, db: Session = Depends(get_session_database)):
     # Get paid orders ordered by most recent first
-    orders = db.query(Order).filter(Order.status == "paid").order_by(Order.created_at.desc()).all()
-
-    # Load person information for each order
-    for order in orders:
-        if order.person_id:
-            person = db.query(Person).filter(Person.id == order.person_id).first()
-            if person:
-                # Add person information to the order
-                order.person_name = person.username
-                order.visit_count = person.visit_count
-
-        # Load dish information for each order item
-        for item in order.items:
-            if not hasattr(item, "dish") or item.dish is None:
-                dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
-                if dish:
-                    item.dish = dish
-
-    return orders
+    query = db.query(Order).filter(Order.status == "paid").order_by(Order.created_at.desc())
+
+    return ModelListResponse(OrderModel, load_order_rows(db, query, with_person=True))
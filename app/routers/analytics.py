@@ -5,7 +5,7 @@ from typing import List, Dict, Any
 from datetime import datetime, timedelta, timezone
 import calendar
 
-from ..database import get_db, Dish, Order, OrderItem, Person, Table, Feedback, get_session_db
+from ..database import get_db, Dish, Order, OrderItem, OrderEvent, Person, Table, Feedback, get_session_db
 from ..models.dish import Dish as DishModel
 from ..models.order import Order as OrderModel
 from ..models.user import Person as PersonModel
@@ -22,7 +22,72 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
+
+
+# Kitchen stages measured from the order event log: (name, from status, to status)
+ORDER_STAGES = [
+    ("accept_latency", "pending", "accepted"),
+    ("cook_time", "accepted", "completed"),
+    ("payment_latency", "completed", "paid"),
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def _summarize_durations(values: List[float]) -> Dict[str, Any]:
+    """Count and p50/p90/p95/p99 (in minutes) of a list of durations in seconds"""
+    values = sorted(values)
+    summary = {"count": len(values)}
+    for pct in (50, 90, 95, 99):
+        summary[f"p{pct}"] = round(_percentile(values, pct) / 60, 2)
+    return summary
+
+
+def _order_stage_durations(db: Session, start_date: datetime, end_date: datetime):
+    """
+    Collect per-order stage durations for orders placed in the date range.
+
+    Returns a list of (hour placed, {stage name: seconds}) tuples, built from
+    the first time each order entered every status.
+    """
+    placed_orders = (
+        db.query(OrderEvent.order_id)
+        .filter(OrderEvent.status == "pending")
+        .filter(OrderEvent.created_at >= start_date)
+        .filter(OrderEvent.created_at <= end_date)
+    )
+
+    events = (
+        db.query(OrderEvent.order_id, OrderEvent.status, OrderEvent.created_at)
+        .filter(OrderEvent.order_id.in_(placed_orders))
+        .order_by(OrderEvent.order_id, OrderEvent.created_at)
+        .all()
+    )
+
+    # First timestamp at which each order entered each status
+    timelines: Dict[int, Dict[str, datetime]] = {}
+    for event in events:
+        timelines.setdefault(event.order_id, {}).setdefault(event.status, event.created_at)
+
+    result = []
+    for timeline in timelines.values():
+        durations = {}
+        for stage, from_status, to_status in ORDER_STAGES:
+            if from_status in timeline and to_status in timeline:
+                durations[stage] = (timeline[to_status] - timeline[from_status]).total_seconds()
+        result.append((timeline["pending"].hour, durations))
+
+    return result
 
 
 # Get overall dashboard statistics
@@ -62,10 +127,8 @@ def get_dashboard_stats(
     # Total sales
     total_sales_query = (
         db.query(
-            func.sum(Dish.price * OrderItem.quantity).label("total_sales")
+            func.sum(Order.total_amount).label("total_sales")
         )
-        .join(OrderItem, Dish.id == OrderItem.dish_id)
-        .join(Order, OrderItem.order_id == Order.id)
         .filter(Order.status == "paid")
     )
 
@@ -96,12 +159,7 @@ def get_dashboard_stats(
     # Average order value
     avg_order_value_query = (
         db.query(
-            func.avg(
-                db.query(func.sum(Dish.price * OrderItem.quantity))
-                .join(OrderItem, Dish.id == OrderItem.dish_id)
-                .filter(OrderItem.order_id == Order.id)
-                .scalar_subquery()
-            ).label("avg_order_value")
+            func.avg(Order.total_amount).label("avg_order_value")
         )
         .filter(Order.status == "paid")
     )
@@ -141,12 +199,7 @@ def get_top_customers(request: Request, limit: int = 10, db: Session = Depends(g
             Person.visit_count,
             Person.last_visit,
             func.count(Order.id).label("order_count"),
-            func.sum(
-                db.query(func.sum(Dish.price * OrderItem.quantity))
-                .join(OrderItem, Dish.id == OrderItem.dish_id)
-                .filter(OrderItem.order_id == Order.id)
-                .scalar_subquery()
-            ).label("total_spent"),
+            func.sum(Order.total_amount).label("total_spent"),
         )
         .join(Order, Person.id == Order.person_id)
         .group_by(Person.id)
@@ -182,7 +235,7 @@ def get_top_dishes(request: Request, limit: int = 10, db: Session = Depends(get_
             Dish.category,
             Dish.price,
             func.sum(OrderItem.quantity).label("total_ordered"),
-            func.sum(Dish.price * OrderItem.quantity).label("total_revenue"),
+            func.sum(OrderItem.unit_price * OrderItem.quantity).label("total_revenue"),
         )
         .join(OrderItem, Dish.id == OrderItem.dish_id)
         .join(Order, OrderItem.order_id == Order.id)
@@ -216,7 +269,7 @@ def get_sales_by_category(request: Request, db: Session = Depends(get_session_da
         db.query(
             Dish.category,
             func.sum(OrderItem.quantity).label("total_ordered"),
-            func.sum(Dish.price * OrderItem.quantity).label("total_revenue"),
+            func.sum(OrderItem.unit_price * OrderItem.quantity).label("total_revenue"),
         )
         .join(OrderItem, Dish.id == OrderItem.dish_id)
         .join(Order, OrderItem.order_id == Order.id)
@@ -250,12 +303,7 @@ def get_sales_over_time(request: Request, days: int = 30, db: Session = Depends(
         db.query(
             func.date(Order.created_at).label("date"),
             func.count(Order.id).label("order_count"),
-            func.sum(
-                db.query(func.sum(Dish.price * OrderItem.quantity))
-                .join(OrderItem, Dish.id == OrderItem.dish_id)
-                .filter(OrderItem.order_id == Order.id)
-                .scalar_subquery()
-            ).label("total_sales"),
+            func.sum(Order.total_amount).label("total_sales"),
         )
         .filter(Order.status == "paid")
         .filter(Order.created_at >= start_date)
@@ -348,13 +396,63 @@ def get_chef_performance(request: Request, days: int = 30, db: Session = Depends
         day_number = int(busiest_day_query.day_of_week)
         busiest_day = day_names[day_number]
 
+    # Real preparation time from the order event log
+    cook_times = [
+        durations["cook_time"]
+        for _, durations in _order_stage_durations(db, start_date, end_date)
+        if "cook_time" in durations
+    ]
+    avg_prep_time_minutes = sum(cook_times) / len(cook_times) / 60 if cook_times else 0
+
     return {
         "total_completed_orders": total_completed,
         "avg_items_per_order": round(avg_items_per_order, 2),
+        "avg_prep_time_minutes": round(avg_prep_time_minutes, 2),
         "busiest_day": busiest_day,
     }
 
 
+# Get kitchen throughput: accept latency, cook time and payment latency percentiles per hour
+@router.get("/kitchen-throughput")
+def get_kitchen_throughput(request: Request, days: int = 7, db: Session = Depends(get_session_database)):
+    # Calculate the date range
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days)
+
+    stage_names = [stage for stage, _, _ in ORDER_STAGES]
+    overall = {stage: [] for stage in stage_names}
+    by_hour: Dict[int, Dict[str, List[float]]] = {}
+    orders_by_hour: Dict[int, int] = {}
+
+    for hour, durations in _order_stage_durations(db, start_date, end_date):
+        orders_by_hour[hour] = orders_by_hour.get(hour, 0) + 1
+        hour_stages = by_hour.setdefault(hour, {stage: [] for stage in stage_names})
+        for stage, seconds in durations.items():
+            overall[stage].append(seconds)
+            hour_stages[stage].append(seconds)
+
+    overall_summary = {stage: _summarize_durations(values) for stage, values in overall.items()}
+
+    # The bottleneck is the stage with the slowest tail
+    measured = [stage for stage in stage_names if overall_summary[stage]["count"]]
+    bottleneck = max(measured, key=lambda stage: overall_summary[stage]["p90"]) if measured else None
+
+    hourly = []
+    for hour in sorted(by_hour):
+        entry = {"hour": hour, "order_count": orders_by_hour[hour]}
+        for stage in stage_names:
+            entry[stage] = _summarize_durations(by_hour[hour][stage])
+        hourly.append(entry)
+
+    return {
+        "days": days,
+        "unit": "minutes",
+        "overall": overall_summary,
+        "by_hour": hourly,
+        "bottleneck": bottleneck,
+    }
+
+
 # Get table utilization statistics
 @router.get("/table-utilization")
 def get_table_utilization(request: Request, db: Session = Depends(get_session_database)):
@@ -366,12 +464,7 @@ def get_table_utilization(request: Request, db: Session = Depends(get_session_da
         db.query(
             Order.table_number,
             func.count(Order.id).label("order_count"),
-            func.sum(
-                db.query(func.sum(Dish.price * OrderItem.quantity))
-                .join(OrderItem, Dish.id == OrderItem.dish_id)
-                .filter(OrderItem.order_id == Order.id)
-                .scalar_subquery()
-            ).label("total_revenue"),
+            func.sum(Order.total_amount).label("total_revenue"),
         )
         .group_by(Order.table_number)
         .all()
@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Union
 from datetime import datetime, timezone
 
-from ..database import get_db, Dish, Order, OrderItem, get_session_db
+from ..database import get_db, Dish, Order, OrderItem, get_session_db, get_session_engine
 from ..models.dish import Dish as DishModel
-from ..models.order import Order as OrderModel
+from ..models.order import Order as OrderModel, OrderDelta
 from ..middleware import get_session_id
+from ..services.order_events import record_order_event
+from ..services.order_rows import load_order_rows
+from ..services.order_notifier import long_poll
+from ..services.sync import CURSOR_HEADER, new_cursor, order_delta, order_delta_with_latest, parse_cursor
+from ..utils.serialization import ModelListResponse, ModelResponse
 
 router = APIRouter(
     prefix="/chef",
@@ -18,7 +24,7 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 # Add an API endpoint to get completed orders count
 @router.get("/api/completed-orders-count")
@@ -26,17 +32,49 @@ def get_completed_orders_count(request: Request, db: Session = Depends(get_sessi
     completed_orders = db.query(Order).filter(Order.status == "completed").count()
     return {"count": completed_orders}
 
-# Get pending orders (orders that need to be accepted)
-@router.get("/orders/pending", response_model=List[OrderModel])
-def get_pending_orders(request: Request, db: Session = Depends(get_session_database)):
-    orders = db.query(Order).filter(Order.status == "pending").all()
-    return orders
-
-# Get accepted orders (orders that have been accepted but not completed)
-@router.get("/orders/accepted", response_model=List[OrderModel])
-def get_accepted_orders(request: Request, db: Session = Depends(get_session_database)):
-    orders = db.query(Order).filter(Order.status == "accepted").all()
-    return orders
+# Get pending orders (orders that need to be accepted), or only the changes since a cursor
+@router.get("/orders/pending", response_model=Union[List[OrderModel], OrderDelta])
+def get_pending_orders(request: Request, since: str = None, db: Session = Depends(get_session_database)):
+    if since:
+        delta = order_delta(db, db.query(Order), since, Order.status == "pending")
+        return ModelResponse(OrderDelta, delta)
+
+    cursor = new_cursor()
+    query = db.query(Order).filter(Order.status == "pending")
+    return ModelListResponse(OrderModel, load_order_rows(db, query), headers={CURSOR_HEADER: cursor})
+
+# Get accepted orders (orders that have been accepted but not completed), or only the changes since a cursor
+@router.get("/orders/accepted", response_model=Union[List[OrderModel], OrderDelta])
+def get_accepted_orders(request: Request, since: str = None, db: Session = Depends(get_session_database)):
+    if since:
+        delta = order_delta(db, db.query(Order), since, Order.status == "accepted")
+        return ModelResponse(OrderDelta, delta)
+
+    cursor = new_cursor()
+    query = db.query(Order).filter(Order.status == "accepted")
+    return ModelListResponse(OrderModel, load_order_rows(db, query), headers={CURSOR_HEADER: cursor})
+
+async def wait_for_queue_changes(request: Request, status: str, since: str, timeout: float):
+    # The session lookup (and a database's first open) blocks, so keep it off the event loop
+    engine = await run_in_threadpool(get_session_engine, get_session_id(request))
+    since_at = parse_cursor(since)
+
+    def check(db: Session):
+        delta, latest = order_delta_with_latest(db, db.query(Order), since, Order.status == status)
+        # Changes inside the cursor's overlap window were most likely sent already
+        return latest is not None and latest > since_at, delta
+
+    return ModelResponse(OrderDelta, await long_poll(engine, timeout, check))
+
+# Wait for changes to the pending queue since a cursor (long poll)
+@router.get("/orders/pending/wait", response_model=OrderDelta)
+async def wait_for_pending_orders(request: Request, since: str, timeout: float = 25):
+    return await wait_for_queue_changes(request, "pending", since, timeout)
+
+# Wait for changes to the accepted queue since a cursor (long poll)
+@router.get("/orders/accepted/wait", response_model=OrderDelta)
+async def wait_for_accepted_orders(request: Request, since: str, timeout: float = 25):
+    return await wait_for_queue_changes(request, "accepted", since, timeout)
 
 # Accept an order
 @router.put("/orders/{order_id}/accept")
@@ -48,8 +86,10 @@ def accept_order(order_id: int, request: Request, db: Session = Depends(get_sess
     if db_order.status != "pending":
         raise HTTPException(status_code=400, detail="Order is not in pending status")
 
+    current_time = datetime.now(timezone.utc)
     db_order.status = "accepted"
-    db_order.updated_at = datetime.now(timezone.utc)
+    db_order.updated_at = current_time
+    record_order_event(db, db_order.id, "accepted", current_time)
 
     db.commit()
 
@@ -65,8 +105,10 @@ def complete_order(order_id: int, request: Request, db: Session = Depends(get_se
     if db_order.status != "accepted":
         raise HTTPException(status_code=400, detail="Order must be accepted before it can be completed")
 
+    current_time = datetime.now(timezone.utc)
     db_order.status = "completed"
-    db_order.updated_at = datetime.now(timezone.utc)
+    db_order.updated_at = current_time
+    record_order_event(db, db_order.id, "completed", current_time)
 
     db.commit()
 
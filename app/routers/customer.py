@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 
-from ..database import get_db, Dish, Order, OrderItem, Person, get_session_db
+from ..database import get_db, Dish, Order, OrderEvent, OrderItem, Person, get_session_db, get_session_engine
 from ..models.dish import Dish as DishModel
-from ..models.order import OrderCreate, Order as OrderModel
+from ..models.order import OrderCreate, Order as OrderModel, OrderDelta
 from ..models.user import (
     PersonCreate,
     PersonLogin,
@@ -17,6 +18,21 @@ from ..models.user import (
 )
 from ..services import firebase_auth
 from ..middleware import get_session_id
+from ..services.order_events import record_order_event
+from ..models.menu import MenuBootstrap
+from ..services.menu import (
+    get_menu_payload,
+    load_categories,
+    load_menu,
+    load_menu_bootstrap,
+    load_offers,
+    load_specials,
+)
+from ..services.order_rows import load_order_rows
+from ..services.order_notifier import long_poll
+from ..services.sync import CURSOR_HEADER, new_cursor, order_delta
+from ..utils.payloads import payload_response
+from ..utils.serialization import ModelListResponse, ModelResponse
 
 router = APIRouter(
     prefix="/customer",
@@ -28,38 +44,38 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
 # Get all dishes for menu (only visible ones)
 @router.get("/api/menu", response_model=List[DishModel])
 def get_menu(request: Request, category: str = None, db: Session = Depends(get_session_database)):
-    if category:
-        dishes = db.query(Dish).filter(Dish.category == category, Dish.visibility == 1).all()
-    else:
-        dishes = db.query(Dish).filter(Dish.visibility == 1).all()
-    return dishes
+    # Serialized and compressed once per menu version, not per request
+    return payload_response(request, get_menu_payload(db, ("menu", category), lambda: load_menu(db, category)))
 
 
 # Get offer dishes (only visible ones)
 @router.get("/api/offers", response_model=List[DishModel])
 def get_offers(request: Request, db: Session = Depends(get_session_database)):
-    dishes = db.query(Dish).filter(Dish.is_offer == 1, Dish.visibility == 1).all()
-    return dishes
+    return payload_response(request, get_menu_payload(db, "offers", lambda: load_offers(db)))
 
 
 # Get special dishes (only visible ones)
 @router.get("/api/specials", response_model=List[DishModel])
 def get_specials(request: Request, db: Session = Depends(get_session_database)):
-    dishes = db.query(Dish).filter(Dish.is_special == 1, Dish.visibility == 1).all()
-    return dishes
+    return payload_response(request, get_menu_payload(db, "specials", lambda: load_specials(db)))
 
 
 # Get all dish categories (only from visible dishes)
 @router.get("/api/categories")
 def get_categories(request: Request, db: Session = Depends(get_session_database)):
-    categories = db.query(Dish.category).filter(Dish.visibility == 1).distinct().all()
-    return [category[0] for category in categories]
+    return payload_response(request, get_menu_payload(db, "categories", lambda: load_categories(db)))
+
+
+# Get everything the menu page renders first in one cached payload
+@router.get("/api/bootstrap", response_model=MenuBootstrap)
+def get_menu_bootstrap(request: Request, db: Session = Depends(get_session_database)):
+    return payload_response(request, get_menu_payload(db, "bootstrap", lambda: load_menu_bootstrap(db)))
 
 
 # Register a new user or update existing user
@@ -164,6 +180,8 @@ def create_order(
         status="pending",
     )
     db.add(db_order)
+    db.flush()
+    record_order_event(db, db_order.id, "pending", db_order.created_at)
     db.commit()
     db.refresh(db_order)
 
@@ -177,6 +195,8 @@ def create_order(
         db.commit()
 
     # Create order items
+    total_amount = 0
+    item_count = 0
     for item in order.items:
         # Get the dish to include its information
         dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
@@ -187,10 +207,18 @@ def create_order(
             order_id=db_order.id,
             dish_id=item.dish_id,
             quantity=item.quantity,
+            unit_price=dish.price,  # Capture the price at order time
             remarks=item.remarks,
         )
         db.add(db_item)
 
+        total_amount += dish.price * item.quantity
+        item_count += item.quantity
+
+    # Maintain denormalized totals so reads don't have to join and sum
+    db_order.total_amount = total_amount
+    db_order.item_count = item_count
+
     db.commit()
     db.refresh(db_order)
 
@@ -215,26 +243,40 @@ def get_order(order_id: int, request: Request, db: Session = Depends(get_session
     return order
 
 
-# Get orders by person_id
-@router.get("/api/person/{person_id}/orders", response_model=List[OrderModel])
-def get_person_orders(person_id: int, request: Request, db: Session = Depends(get_session_database)):
-    # Get all orders for a specific person
-    orders = (
+# Wait for an order's status to change from the one the client last saw (long poll)
+@router.get("/api/orders/{order_id}/wait", response_model=OrderModel)
+async def wait_for_order_status(order_id: int, request: Request, status: str, timeout: float = 25):
+    # The session lookup (and a database's first open) blocks, so keep it off the event loop
+    engine = await run_in_threadpool(get_session_engine, get_session_id(request))
+
+    def check(db: Session):
+        rows = load_order_rows(db, db.query(Order).filter(Order.id == order_id))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return rows[0]["status"] != status, rows[0]
+
+    # Returns the order as soon as its status changes, or as it is when the timeout elapses
+    order = await long_poll(engine, timeout, check)
+    return ModelResponse(OrderModel, order)
+
+
+# Get orders by person_id, or only the changes since a cursor
+@router.get("/api/person/{person_id}/orders", response_model=Union[List[OrderModel], OrderDelta])
+def get_person_orders(person_id: int, request: Request, since: str = None, db: Session = Depends(get_session_database)):
+    # Get all orders for a specific person, with items and dishes loaded in bulk
+    query = (
         db.query(Order)
         .filter(Order.person_id == person_id)
         .order_by(Order.created_at.desc())
-        .all()
     )
 
-    # Explicitly load dish information for each order item
-    for order in orders:
-        for item in order.items:
-            if not hasattr(item, "dish") or item.dish is None:
-                dish = db.query(Dish).filter(Dish.id == item.dish_id).first()
-                if dish:
-                    item.dish = dish
+    if since:
+        # Only this person's merged orders, not every merge in the hotel
+        mine = (OrderEvent.person_id == person_id,)
+        return ModelResponse(OrderDelta, order_delta(db, query, since, tombstone_scope=mine))
 
-    return orders
+    cursor = new_cursor()
+    return ModelListResponse(OrderModel, load_order_rows(db, query), headers={CURSOR_HEADER: cursor})
 
 
 # Request payment for order
@@ -258,8 +300,10 @@ def request_payment(order_id: int, request: Request, db: Session = Depends(get_s
             )
 
         # Update order status to paid
+        current_time = datetime.now(timezone.utc)
         db_order.status = "paid"
-        db_order.updated_at = datetime.now(timezone.utc)
+        db_order.updated_at = current_time
+        record_order_event(db, db_order.id, "paid", current_time)
 
         # Check if this is the last unpaid order for this table
         from ..database import Table
@@ -318,6 +362,11 @@ def cancel_order(order_id: int, request: Request, db: Session = Depends(get_sess
     db_order.status = "cancelled"
     db_order.updated_at = current_time
 
+    # A cancelled order is not billed, so it no longer contributes to totals
+    db_order.total_amount = 0
+    db_order.item_count = 0
+    record_order_event(db, db_order.id, "cancelled", current_time)
+
     # Mark the table as free if this was the current order
     from ..database import Table
 
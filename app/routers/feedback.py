@@ -17,7 +17,7 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
 # Create new feedback
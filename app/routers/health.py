@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..services.warm_up import tenant_warm_up
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+# Liveness: the process is up and serving
+@router.get("")
+def health():
+    return {"status": "ok"}
+
+
+# Readiness: 503 until every hotel database has been warmed up, so load
+# balancers hold traffic back from a worker that just restarted
+@router.get("/ready")
+def ready():
+    return JSONResponse(
+        status_code=200 if tenant_warm_up.ready else 503,
+        content=tenant_warm_up.status(),
+    )
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from ..database import get_db, LoyaltyProgram as LoyaltyProgramModel, get_session_db
 from ..models.loyalty import LoyaltyProgram, LoyaltyProgramCreate, LoyaltyProgramUpdate
 from ..middleware import get_session_id
+from ..services.menu import invalidate_menu
 
 router = APIRouter(
     prefix="/loyalty",
@@ -17,7 +18,7 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
 # Get all loyalty program tiers
@@ -73,6 +74,7 @@ def create_loyalty_tier(tier: LoyaltyProgramCreate, request: Request, db: Sessio
     )
     db.add(db_tier)
     db.commit()
+    invalidate_menu(db)
     db.refresh(db_tier)
     return db_tier
 
@@ -116,6 +118,7 @@ def update_loyalty_tier(
 
     db_tier.updated_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_menu(db)
     db.refresh(db_tier)
     return db_tier
 
@@ -131,6 +134,7 @@ def delete_loyalty_tier(tier_id: int, request: Request, db: Session = Depends(ge
 
     db.delete(db_tier)
     db.commit()
+    invalidate_menu(db)
     return {"message": "Loyalty tier deleted successfully"}
 
 
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+import os
+import secrets
+
+from .. import database
+from ..database import db_manager
+from ..utils.cache import caches
+from ..utils.metrics import registry, CONTENT_TYPE
+from ..utils.pdf_generator import pdf_cache_stats
+from ..utils.render_pool import bill_render_pool
+
+# Metrics name tenant databases, so the endpoint is off (404) unless this is
+# set; scrapes must then send "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("TABBLE_METRICS_TOKEN", "")
+
+router = APIRouter(
+    tags=["metrics"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def _engines():
+    """(tenant, engine) for every open engine: one per tenant plus the legacy global one"""
+    with db_manager.lock:
+        connections = list(db_manager.connections.values())
+    engines = [(connection["database_name"], connection["engine"]) for connection in connections]
+    engines.append((os.path.basename(database.engine.url.database or ""), database.engine))
+    return engines
+
+
+def _pool_totals() -> dict:
+    """Pool usage summed per tenant (the legacy engine may point at a tenant too)"""
+    totals = {}
+    for tenant, engine in _engines():
+        pool = engine.pool
+        entry = totals.setdefault(tenant, {"engines": 0, "size": 0, "checked_out": 0, "overflow": 0})
+        entry["engines"] += 1
+        if hasattr(pool, "checkedout"):
+            entry["size"] += pool.size()
+            entry["checked_out"] += pool.checkedout()
+            # QueuePool counts overflow from -size while the pool is not full
+            entry["overflow"] += max(pool.overflow(), 0)
+    return totals
+
+
+def _pool_metric(field: str):
+    def collect():
+        return [({"tenant": tenant}, entry[field]) for tenant, entry in _pool_totals().items()]
+    return collect
+
+
+def _cache_metric(field: str):
+    def collect():
+        stats = [cache.stats() for cache in caches] + [pdf_cache_stats()]
+        return [({"cache": entry["name"]}, entry[field]) for entry in stats]
+    return collect
+
+
+def _render_pool_metric(field: str):
+    def collect():
+        return [({}, bill_render_pool.stats()[field])]
+    return collect
+
+
+registry.collector("tabble_sessions", "gauge", "Live sessions in the session store")(
+    lambda: [({}, db_manager.store.count())])
+registry.collector("tabble_db_engines", "gauge", "Open engines per tenant")(_pool_metric("engines"))
+registry.collector("tabble_db_pool_size", "gauge", "Configured pool size summed over a tenant's engines")(
+    _pool_metric("size"))
+registry.collector("tabble_db_pool_checked_out", "gauge", "Connections currently checked out per tenant")(
+    _pool_metric("checked_out"))
+registry.collector("tabble_db_pool_overflow", "gauge", "Connections opened beyond the pool size per tenant")(
+    _pool_metric("overflow"))
+registry.collector("tabble_cache_entries", "gauge", "Entries held per cache")(_cache_metric("entries"))
+registry.collector("tabble_cache_hits_total", "counter", "Cache lookups answered from the cache")(
+    _cache_metric("hits"))
+registry.collector("tabble_cache_misses_total", "counter", "Cache lookups that had to load the value")(
+    _cache_metric("misses"))
+registry.collector("tabble_cache_hit_ratio", "gauge", "Hits over lookups since start")(_cache_metric("hit_ratio"))
+registry.collector("tabble_pdf_render_queue_depth", "gauge", "Bill renders queued or running")(
+    _render_pool_metric("queue_depth"))
+registry.collector("tabble_pdf_render_rejected_total", "counter", "Bill renders refused because the queue was full")(
+    _render_pool_metric("rejected"))
+registry.collector("tabble_pdf_render_timeouts_total", "counter", "Bill renders that ran past the timeout")(
+    _render_pool_metric("timeouts"))
+registry.collector("tabble_pdf_render_failed_total", "counter", "Bill renders that raised an error")(
+    _render_pool_metric("failed"))
+
+
+# Prometheus scrape endpoint
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    authorization = request.headers.get("authorization", "")
+    if not secrets.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..utils.profiler import (
+    profile_lock, profile_threads, request_profiles, token_matches,
+    PROFILER_TOKEN, PROFILER_INTERVAL, PROFILER_MAX_SECONDS,
+)
+
+
+def require_profiler_token(request: Request):
+    """Profiling is off unless TABBLE_PROFILER_TOKEN is set, and then needs that token"""
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    authorization = request.headers.get("authorization", "")
+    if not token_matches(authorization.removeprefix("Bearer ")):
+        raise HTTPException(status_code=401, detail="Invalid profiler token")
+
+
+router = APIRouter(
+    prefix="/admin/profiler",
+    tags=["admin"],
+    dependencies=[Depends(require_profiler_token)],
+    responses={404: {"description": "Not found"}},
+)
+
+
+# Sample every thread for a number of seconds and return collapsed stacks
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(PROFILER_INTERVAL * 1000, ge=1, le=1000),
+    idle: bool = Query(False, description="Include threads waiting for work"),
+):
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        stacks = await run_in_threadpool(profile_threads, seconds, interval_ms / 1000, idle)
+    finally:
+        profile_lock.release()
+    return PlainTextResponse(stacks)
+
+
+# List recent per-request profiles (requests sent with the X-Profile header)
+@router.get("/requests")
+def list_request_profiles():
+    return request_profiles.summaries()
+
+
+# Get the collapsed stacks of one profiled request
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+def get_request_profile(profile_id: str):
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["stacks"])
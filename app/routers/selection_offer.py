@@ -10,6 +10,7 @@ from ..models.selection_offer import (
     SelectionOfferUpdate,
 )
 from ..middleware import get_session_id
+from ..services.menu import invalidate_menu
 
 router = APIRouter(
     prefix="/selection-offers",
@@ -21,7 +22,7 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
 # Get all selection offers
@@ -78,6 +79,7 @@ def create_selection_offer(offer: SelectionOfferCreate, request: Request, db: Se
     )
     db.add(db_offer)
     db.commit()
+    invalidate_menu(db)
     db.refresh(db_offer)
     return db_offer
 
@@ -123,6 +125,7 @@ def update_selection_offer(
 
     db_offer.updated_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_menu(db)
     db.refresh(db_offer)
     return db_offer
 
@@ -138,6 +141,7 @@ def delete_selection_offer(offer_id: int, request: Request, db: Session = Depend
 
     db.delete(db_offer)
     db.commit()
+    invalidate_menu(db)
     return {"message": "Selection offer deleted successfully"}
 
 
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, R
 from sqlalchemy.orm import Session
 from typing import Optional, List
 import os
-import shutil
 import csv
 from datetime import datetime, timezone
 
@@ -13,6 +12,9 @@ from ..database import (
 from ..models.settings import Settings as SettingsModel, SettingsUpdate
 from ..models.database_config import DatabaseEntry, DatabaseList, DatabaseSelectRequest, DatabaseSelectResponse
 from ..middleware import get_session_id
+from ..services.bills import invalidate_bill_settings
+from ..services.menu import invalidate_menu
+from ..utils.uploads import save_image_upload
 
 router = APIRouter(
     prefix="/settings",
@@ -24,7 +26,7 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
 # Get available databases from hotels.csv
@@ -102,6 +104,10 @@ def get_settings(request: Request, db: Session = Depends(get_session_database)):
         db.commit()
         db.refresh(settings)
 
+        # The menu bootstrap and bills may have cached "no settings" before this
+        invalidate_menu(db)
+        invalidate_bill_settings(db)
+
     return settings
 
 
@@ -139,21 +145,14 @@ async def update_settings(
 
     # Handle logo upload if provided
     if logo:
-        # Get current database name for organizing logos
+        # Store under app/static/images/logo/{db_name}, named by content hash
         session_id = get_session_id(request)
         current_db = get_session_current_database(session_id)
-
-        # Create directory structure: app/static/images/logo/{db_name}
-        db_logo_dir = f"app/static/images/logo/{current_db}"
-        os.makedirs(db_logo_dir, exist_ok=True)
-
-        # Save logo with database-specific path
-        logo_path = f"{db_logo_dir}/hotel_logo_{logo.filename}"
-        with open(logo_path, "wb") as buffer:
-            shutil.copyfileobj(logo.file, buffer)
+        stored = await save_image_upload(logo, f"images/logo/{current_db}")
 
         # Update settings with logo path (URL path for serving)
-        settings.logo_path = f"/static/images/logo/{current_db}/hotel_logo_{logo.filename}"
+        settings.logo_path = stored.url
+        settings.logo_hash = stored.sha256
 
     # Update timestamp
     settings.updated_at = datetime.now(timezone.utc)
@@ -161,4 +160,8 @@ async def update_settings(
     db.commit()
     db.refresh(settings)
 
+    # Bills and the menu bootstrap must pick up the new hotel details
+    invalidate_bill_settings(db)
+    invalidate_menu(db)
+
     return settings
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from datetime import datetime, timezone
 
 from ..database import get_db, Table as TableModel, Order, get_session_db
-from ..models.table import Table, TableCreate, TableUpdate, TableStatus
+from ..models.table import Table, TableCreate, TableUpdate, TableStatus, TableDelta
 from ..middleware import get_session_id
+from ..services.sync import CURSOR_HEADER, delta_start, new_cursor
+from ..utils.serialization import ModelListResponse, ModelResponse, column_rows
 
 router = APIRouter(
     prefix="/tables",
@@ -17,13 +19,21 @@ router = APIRouter(
 # Dependency to get session-aware database
 def get_session_database(request: Request):
     session_id = get_session_id(request)
-    return next(get_session_db(session_id))
+    yield from get_session_db(session_id)
 
 
-# Get all tables
-@router.get("/", response_model=List[Table])
-def get_all_tables(request: Request, db: Session = Depends(get_session_database)):
-    return db.query(TableModel).order_by(TableModel.table_number).all()
+# Get all tables, or only the ones changed since a cursor
+@router.get("/", response_model=Union[List[Table], TableDelta])
+def get_all_tables(request: Request, since: str = None, db: Session = Depends(get_session_database)):
+    cursor = new_cursor()
+    query = db.query(TableModel).order_by(TableModel.table_number)
+
+    if since:
+        query = query.filter(TableModel.updated_at > delta_start(since))
+        changed = column_rows(query, TableModel, Table)
+        return ModelResponse(TableDelta, {"cursor": cursor, "changed": changed})
+
+    return ModelListResponse(Table, column_rows(query, TableModel, Table), headers={CURSOR_HEADER: cursor})
 
 
 # Get table by ID
@@ -0,0 +1,106 @@
+from typing import Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ..database import Order, OrderItem, Dish, Person, Settings
+from ..utils.cache import TenantCache, tenant_key
+from ..utils.pdf_generator import snapshot_settings
+
+# Hotel settings as printed on bills, per tenant
+settings_cache = TenantCache("settings")
+
+# Stay well under SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+
+def chunked(values: list, size: int = IN_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def get_bill_settings(db: Session) -> dict:
+    """Return the tenant's bill settings snapshot, creating defaults if missing"""
+
+    def load():
+        settings = db.query(Settings).first()
+        if not settings:
+            # Create default settings if none exist
+            settings = Settings(
+                hotel_name="Tabble Hotel",
+                address="123 Main Street, City",
+                contact_number="+1 123-456-7890",
+                email="info@tabblehotel.com",
+            )
+            db.add(settings)
+            db.commit()
+            db.refresh(settings)
+        return snapshot_settings(settings)
+
+    return settings_cache.get_or_load(tenant_key(db), "bill", load)
+
+
+def prime_bill_settings(db: Session):
+    """Cache the tenant's bill settings if it has any; unlike get_bill_settings, never writes defaults"""
+    if db.query(Settings.id).first() is not None:
+        get_bill_settings(db)
+
+
+def invalidate_bill_settings(db: Session):
+    """Forget the cached settings after they were changed"""
+    settings_cache.invalidate(tenant_key(db))
+
+
+def load_order_snapshots(db: Session, order_ids: List[int]) -> List[dict]:
+    """
+    Load bill snapshots for several orders in a fixed number of queries.
+
+    One query fetches the orders with their person names, one fetches every
+    item with its dish, regardless of how many orders are billed. The result
+    has the same shape as snapshot_order() and follows the order of order_ids.
+
+    Raises:
+        HTTPException: 404 for the first requested order that does not exist
+    """
+    unique_ids = list(dict.fromkeys(order_ids))
+    orders: Dict[int, dict] = {}
+
+    for chunk in chunked(unique_ids):
+        rows = (
+            db.query(Order.id, Order.table_number, Order.status, Person.username)
+            .outerjoin(Person, Person.id == Order.person_id)
+            .filter(Order.id.in_(chunk))
+            .all()
+        )
+        for order_id, table_number, status, username in rows:
+            orders[order_id] = {
+                "id": order_id,
+                "table_number": table_number,
+                "status": status,
+                "person_name": username or "",
+                "items": [],
+            }
+
+    for order_id in unique_ids:
+        if order_id not in orders:
+            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+
+    for chunk in chunked(unique_ids):
+        rows = (
+            db.query(OrderItem.order_id, OrderItem.quantity, OrderItem.unit_price, Dish.name, Dish.price)
+            .outerjoin(Dish, Dish.id == OrderItem.dish_id)
+            .filter(OrderItem.order_id.in_(chunk))
+            .order_by(OrderItem.order_id, OrderItem.id)
+            .all()
+        )
+        for order_id, quantity, unit_price, dish_name, dish_price in rows:
+            # Bill at the price captured when the item was ordered
+            if unit_price is None:
+                unit_price = dish_price if dish_price is not None else 0
+            orders[order_id]["items"].append({
+                "name": dish_name if dish_name is not None else "Unknown Dish",
+                "quantity": quantity,
+                "unit_price": unit_price,
+            })
+
+    return [orders[order_id] for order_id in unique_ids]
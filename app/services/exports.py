@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from ..database import Order, OrderItem, Dish, Person
+
+# Rows fetched from the cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+# Output is buffered up to roughly this many bytes before it is sent
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_COLUMNS = [
+    "order_id", "table_number", "unique_id", "status", "person_id", "person_name",
+    "order_created_at", "order_updated_at", "total_amount", "item_count",
+    "item_id", "dish_id", "dish_name", "category", "quantity", "unit_price", "line_total",
+]
+
+
+def _export_query(start: Optional[datetime], end: Optional[datetime], status: Optional[str]):
+    query = (
+        select(
+            Order.id, Order.table_number, Order.unique_id, Order.status, Order.person_id,
+            Person.username, Order.created_at, Order.updated_at, Order.total_amount, Order.item_count,
+            OrderItem.id, OrderItem.dish_id, Dish.name, Dish.category, OrderItem.quantity,
+            OrderItem.unit_price,
+        )
+        .select_from(Order)
+        .outerjoin(Person, Person.id == Order.person_id)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Dish, Dish.id == OrderItem.dish_id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    if start:
+        query = query.where(Order.created_at >= start)
+    if end:
+        query = query.where(Order.created_at <= end)
+    if status:
+        query = query.where(Order.status == status)
+    return query
+
+
+def _iter_rows(engine: Engine, start, end, status) -> Iterator[dict]:
+    """
+    Yield one flat dict per order item, straight off a server-side cursor.
+
+    Uses its own connection rather than the request's session: the response
+    body is produced after the endpoint returns, possibly on other threads.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(
+            _export_query(start, end, status)
+        )
+        for row in result:
+            row = dict(zip(EXPORT_COLUMNS, row))
+            if row["item_id"] is not None:
+                row["line_total"] = (row["unit_price"] or 0) * (row["quantity"] or 0)
+            else:
+                row["line_total"] = None
+            for key in ("order_created_at", "order_updated_at"):
+                if row[key] is not None:
+                    row[key] = row[key].isoformat()
+            yield row
+
+
+def _iter_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    """One JSON object per order, with its items nested"""
+    order = None
+    for row in rows:
+        if order is None or order["id"] != row["order_id"]:
+            if order is not None:
+                yield json.dumps(order) + "\n"
+            order = {
+                "id": row["order_id"],
+                "table_number": row["table_number"],
+                "unique_id": row["unique_id"],
+                "status": row["status"],
+                "person_id": row["person_id"],
+                "person_name": row["person_name"],
+                "created_at": row["order_created_at"],
+                "updated_at": row["order_updated_at"],
+                "total_amount": row["total_amount"],
+                "item_count": row["item_count"],
+                "items": [],
+            }
+        if row["item_id"] is not None:
+            order["items"].append({
+                "id": row["item_id"],
+                "dish_id": row["dish_id"],
+                "dish_name": row["dish_name"],
+                "category": row["category"],
+                "quantity": row["quantity"],
+                "unit_price": row["unit_price"],
+                "line_total": row["line_total"],
+            })
+    if order is not None:
+        yield json.dumps(order) + "\n"
+
+
+def _iter_csv(rows: Iterator[dict]) -> Iterator[str]:
+    """One CSV line per order item, orders without items get one empty-item line"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _iter_chunks(lines: Iterator[str], compress: bool) -> Iterator[bytes]:
+    """Coalesce lines into chunks of about EXPORT_CHUNK_BYTES, optionally gzipped"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def stream_orders_export(
+    engine: Engine,
+    format: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[str] = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Stream orders joined with their items and dishes as NDJSON or CSV.
+
+    Memory use stays constant however many orders match, and the first
+    bytes are sent as soon as the first batch has been fetched.
+    """
+    rows = _iter_rows(engine, start, end, status)
+    lines = _iter_ndjson(rows) if format == "ndjson" else _iter_csv(rows)
+    return _iter_chunks(lines, compress)
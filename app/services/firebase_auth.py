@@ -1,7 +1,5 @@
-import firebase_admin
-from firebase_admin import credentials, auth
 import os
-import json
+import threading
 from fastapi import HTTPException, status
 
 # Initialize Firebase Admin SDK
@@ -10,22 +8,41 @@ cred_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file_
 
 # Global variable to track initialization
 firebase_initialized = False
+firebase_app = None
+
+# The Admin SDK is slow to import and only the phone login needs it, so it
+# is loaded and initialized on first use rather than at startup
+_firebase_lock = threading.Lock()
+_firebase_attempted = False
+
+
+def init_firebase() -> bool:
+    """Initialize Firebase once, on first use; returns whether it is available"""
+    global firebase_initialized, firebase_app, _firebase_attempted
+    with _firebase_lock:
+        if _firebase_attempted:
+            return firebase_initialized
+        _firebase_attempted = True
+        try:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            # Check if Firebase is already initialized
+            try:
+                firebase_app = firebase_admin.get_app()
+                firebase_initialized = True
+                print("Firebase already initialized")
+            except ValueError:
+                # Initialize Firebase if not already initialized
+                cred = credentials.Certificate(cred_path)
+                firebase_app = firebase_admin.initialize_app(cred)
+                firebase_initialized = True
+                print("Firebase initialized successfully")
+        except Exception as e:
+            print(f"Firebase initialization error: {e}")
+            # Continue without crashing, but authentication will fail
+        return firebase_initialized
 
-try:
-    # Check if Firebase is already initialized
-    try:
-        firebase_app = firebase_admin.get_app()
-        firebase_initialized = True
-        print("Firebase already initialized")
-    except ValueError:
-        # Initialize Firebase if not already initialized
-        cred = credentials.Certificate(cred_path)
-        firebase_app = firebase_admin.initialize_app(cred)
-        firebase_initialized = True
-        print("Firebase initialized successfully")
-except Exception as e:
-    print(f"Firebase initialization error: {e}")
-    # Continue without crashing, but authentication will fail
 
 # Firebase Authentication functions
 def verify_phone_number(phone_number):
@@ -35,7 +52,7 @@ def verify_phone_number(phone_number):
     """
     try:
         # Check if Firebase is initialized
-        if not firebase_initialized:
+        if not init_firebase():
             print("Firebase is not initialized, using mock verification")
 
         # Validate phone number format (should start with +91)
@@ -73,7 +90,7 @@ def verify_otp(phone_number, otp, session_info=None):
     """
     try:
         # Check if Firebase is initialized
-        if not firebase_initialized:
+        if not init_firebase():
             print("Firebase is not initialized, using mock verification")
 
         # Validate OTP format
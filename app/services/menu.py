@@ -0,0 +1,104 @@
+import hashlib
+from typing import Callable, Hashable, Union
+
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..database import Dish, LoyaltyProgram, SelectionOffer, Settings
+from ..models.dish import Dish as DishModel
+from ..models.loyalty import LoyaltyProgram as LoyaltyProgramModel
+from ..models.menu import MenuBootstrap
+from ..models.selection_offer import SelectionOffer as SelectionOfferModel
+from ..models.settings import Settings as SettingsModel
+from ..utils.cache import TenantCache, tenant_key
+from ..utils.payloads import CachedPayload, build_payload
+from ..utils.serialization import column_rows, dump_models_json
+
+# Serialized (and lazily compressed) customer menu responses, per tenant
+menu_cache = TenantCache("menu")
+
+bootstrap_adapter = TypeAdapter(MenuBootstrap)
+
+
+def get_menu_payload(db: Session, key: Hashable, load: Callable[[], object]) -> CachedPayload:
+    """Return the cached payload for a menu view, building it from load() on a miss"""
+    return menu_cache.get_or_load(tenant_key(db), key, lambda: build_payload(load()))
+
+
+def invalidate_menu(db: Union[Session, Engine]):
+    """
+    Drop every cached menu view of the tenant.
+
+    Called after writes to dishes, hotel settings, loyalty tiers or
+    selection offers, since the bootstrap payload includes all of them.
+    """
+    menu_cache.invalidate(tenant_key(db))
+
+
+def load_menu(db: Session, category: str = None) -> bytes:
+    """Visible dishes, optionally of one category, as JSON bytes"""
+    query = db.query(Dish).filter(Dish.visibility == 1)
+    if category:
+        query = query.filter(Dish.category == category)
+    return dump_models_json(DishModel, column_rows(query, Dish, DishModel))
+
+
+def load_offers(db: Session) -> bytes:
+    query = db.query(Dish).filter(Dish.is_offer == 1, Dish.visibility == 1)
+    return dump_models_json(DishModel, column_rows(query, Dish, DishModel))
+
+
+def load_specials(db: Session) -> bytes:
+    query = db.query(Dish).filter(Dish.is_special == 1, Dish.visibility == 1)
+    return dump_models_json(DishModel, column_rows(query, Dish, DishModel))
+
+
+def load_categories(db: Session) -> list:
+    categories = db.query(Dish.category).filter(Dish.visibility == 1).distinct().all()
+    return [category[0] for category in categories]
+
+
+def prime_menu(db: Session):
+    """Fill the menu views a customer opens first, so the first diner after a restart hits the cache"""
+    get_menu_payload(db, "bootstrap", lambda: load_menu_bootstrap(db))
+    get_menu_payload(db, ("menu", None), lambda: load_menu(db))
+    get_menu_payload(db, "categories", lambda: load_categories(db))
+    get_menu_payload(db, "offers", lambda: load_offers(db))
+    get_menu_payload(db, "specials", lambda: load_specials(db))
+
+
+def load_menu_bootstrap(db: Session) -> bytes:
+    """
+    Build the customer menu bootstrap document as JSON bytes.
+
+    Visible dishes are loaded once and the categories, specials and offers
+    are derived from them. The version is a hash of the content, so it only
+    changes when something the menu page shows has changed.
+    """
+    menu = column_rows(db.query(Dish).filter(Dish.visibility == 1), Dish, DishModel)
+    settings = db.query(Settings).first()
+    loyalty_tiers = (
+        db.query(LoyaltyProgram)
+        .filter(LoyaltyProgram.is_active == True)
+        .order_by(LoyaltyProgram.visit_count)
+    )
+    selection_offers = (
+        db.query(SelectionOffer)
+        .filter(SelectionOffer.is_active == True)
+        .order_by(SelectionOffer.min_amount)
+    )
+
+    bootstrap = MenuBootstrap(
+        version="",
+        menu=menu,
+        categories=list(dict.fromkeys(dish["category"] for dish in menu)),
+        specials=[dish for dish in menu if dish["is_special"] == 1],
+        offers=[dish for dish in menu if dish["is_offer"] == 1],
+        settings=SettingsModel.model_validate(settings) if settings else None,
+        loyalty_tiers=column_rows(loyalty_tiers, LoyaltyProgram, LoyaltyProgramModel),
+        selection_offers=column_rows(selection_offers, SelectionOffer, SelectionOfferModel),
+    )
+    content = bootstrap_adapter.dump_json(bootstrap, exclude={"version"})
+    bootstrap.version = hashlib.sha256(content).hexdigest()[:16]
+    return bootstrap_adapter.dump_json(bootstrap)
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import OrderEvent
+
+
+def record_order_event(
+    db: Session,
+    order_id: int,
+    status: str,
+    at: Optional[datetime] = None,
+    person_id: Optional[int] = None,
+) -> OrderEvent:
+    """
+    Append a status transition to the order event log.
+
+    The event is added to the caller's session so it is committed atomically
+    with the status change itself. person_id is recorded for events that
+    remove the order (merges), so deltas of one person's orders can still
+    tell which removed ids were theirs.
+    """
+    event = OrderEvent(
+        order_id=order_id,
+        status=status,
+        created_at=at or datetime.now(timezone.utc),
+        person_id=person_id,
+    )
+    db.add(event)
+    return event
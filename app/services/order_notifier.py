@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import Order, OrderItem, OrderEvent
+from ..utils.cache import tenant_key
+from ..utils.invalidation import cache_bus
+
+# Upper bound for how long a long-poll request may wait, in seconds
+LONG_POLL_MAX_WAIT = float(os.getenv("TABBLE_LONG_POLL_MAX_WAIT", "30"))
+
+# Writes to these tables wake long-poll waiters of the tenant
+WATCHED_ENTITIES = (Order, OrderItem, OrderEvent)
+
+
+class OrderNotifier:
+    """
+    Wakes long-poll requests when a tenant's orders change.
+
+    Each tenant has a version number that is bumped after every committed
+    order write. A waiter reads the version, checks its condition and then
+    waits for the version to move past what it read, so a change that lands
+    between the check and the wait is not missed. Waiting is a future on the
+    event loop and holds no thread; writers run in the thread pool and hand
+    the wakeup to the loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions: Dict[str, int] = {}
+        self.waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+
+    def version(self, tenant: str) -> int:
+        with self.lock:
+            return self.versions.get(tenant, 0)
+
+    def notify(self, tenant: str):
+        """Bump the tenant's version and wake everyone waiting on it"""
+        with self.lock:
+            self.versions[tenant] = self.versions.get(tenant, 0) + 1
+            waiters = self.waiters.pop(tenant, [])
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    async def wait(self, tenant: str, version: int, timeout: float) -> bool:
+        """
+        Wait until the tenant's version differs from version.
+
+        Returns True when a change was notified, False on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            if self.versions.get(tenant, 0) != version:
+                return True
+            self.waiters.setdefault(tenant, []).append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self.lock:
+                waiters = self.waiters.get(tenant, [])
+                if (loop, future) in waiters:
+                    waiters.remove((loop, future))
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+order_notifier = OrderNotifier()
+
+# Commits made by other worker processes wake this worker's waiters too;
+# a wakeup without an order change only costs the waiters one re-check
+cache_bus.subscribe_changes(order_notifier.notify)
+
+
+def _run_check(engine: Engine, check: Callable[[Session], Tuple[bool, Any]]):
+    # A short-lived session per check: the request-scoped session is
+    # thread-local and must not be held across awaits
+    with Session(engine) as db:
+        return check(db)
+
+
+async def long_poll(engine: Engine, timeout: float, check: Callable[[Session], Tuple[bool, Any]]) -> Any:
+    """
+    Re-run check(db) after every order change of the tenant until it reports ready.
+
+    check returns (ready, value). The value is returned as soon as ready is
+    True, or the last value once timeout seconds (capped at
+    LONG_POLL_MAX_WAIT) have passed. Checks run in the thread pool; the
+    waits in between hold no thread.
+    """
+    tenant = tenant_key(engine)
+    cache_bus.watch(tenant)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, min(timeout, LONG_POLL_MAX_WAIT))
+
+    while True:
+        version = order_notifier.version(tenant)
+        ready, value = await run_in_threadpool(_run_check, engine, check)
+        remaining = deadline - loop.time()
+        if ready or remaining <= 0:
+            return value
+        if not await order_notifier.wait(tenant, version, remaining):
+            return value
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_order_writes(session: Session, flush_context):
+    """Remember that this transaction touched orders, to notify once it commits"""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, WATCHED_ENTITIES):
+            session.info["orders_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_order_writes(session: Session):
+    if session.info.pop("orders_changed", False):
+        order_notifier.notify(tenant_key(session))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_order_writes(session: Session):
+    session.info.pop("orders_changed", None)
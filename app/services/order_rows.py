@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+from sqlalchemy.orm import Query, Session
+
+from ..database import Order, OrderItem, Dish, Person
+from ..models.dish import Dish as DishModel
+from ..models.order import Order as OrderModel, OrderItem as OrderItemModel
+from ..utils.serialization import model_columns
+from .bills import chunked
+
+
+def load_order_rows(db: Session, query: Query, with_person: bool = False) -> List[dict]:
+    """
+    Load the orders matched by an ORM query as plain dicts shaped like OrderModel.
+
+    One query loads the orders (joined with their person when with_person is
+    set), and one query per 500 orders loads all their items joined with
+    their dishes. Nothing is loaded lazily and no ORM objects are built, so
+    the rows can go straight to the serialization fast path.
+    """
+    order_columns = model_columns(Order, OrderModel)
+    order_names = [column.name for column in order_columns]
+
+    if with_person:
+        rows = (
+            query.with_entities(*order_columns, Person.username, Person.visit_count)
+            .outerjoin(Person, Person.id == Order.person_id)
+            .all()
+        )
+        orders = []
+        for row in rows:
+            order = dict(zip(order_names, row[:-2]))
+            order["person_name"], order["visit_count"] = row[-2:]
+            orders.append(order)
+    else:
+        orders = [dict(zip(order_names, row)) for row in query.with_entities(*order_columns)]
+
+    by_id: Dict[int, dict] = {}
+    for order in orders:
+        order["items"] = []
+        by_id[order["id"]] = order
+
+    item_columns = model_columns(OrderItem, OrderItemModel)
+    item_names = [column.name for column in item_columns]
+    dish_columns = model_columns(Dish, DishModel)
+    dish_names = [column.name for column in dish_columns]
+    item_width = len(item_columns)
+
+    for chunk in chunked(list(by_id)):
+        rows = (
+            db.query(*item_columns, *dish_columns)
+            .outerjoin(Dish, Dish.id == OrderItem.dish_id)
+            .filter(OrderItem.order_id.in_(chunk))
+            .order_by(OrderItem.order_id, OrderItem.id)
+            .all()
+        )
+        for row in rows:
+            item = dict(zip(item_names, row[:item_width]))
+            dish = dict(zip(dish_names, row[item_width:]))
+            item["dish"] = dish if dish["id"] is not None else None
+            by_id[item["order_id"]]["items"].append(item)
+
+    return orders
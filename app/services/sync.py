@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import and_, not_
+from sqlalchemy.orm import Query, Session
+
+from ..database import Order, OrderEvent
+from .order_rows import load_order_rows
+
+# Writes stamp updated_at before they commit, so a row can become visible
+# slightly after its timestamp. Deltas reach back this far before the cursor
+# so such rows are sent again on the next poll instead of being missed.
+SYNC_OVERLAP = timedelta(seconds=2)
+
+# Order statuses whose event means the order row itself is gone
+TOMBSTONE_STATUSES = ("merged",)
+
+CURSOR_HEADER = "X-Sync-Cursor"
+
+
+def new_cursor() -> str:
+    """Cursor for a response built from the database state as of now"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_cursor(since: str) -> datetime:
+    """
+    Turn a since= parameter back into a timestamp.
+
+    Raises:
+        HTTPException: 400 if the cursor is not an ISO timestamp
+    """
+    try:
+        cursor = datetime.fromisoformat(since.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since cursor, expected an ISO timestamp")
+    if cursor.tzinfo is not None:
+        cursor = cursor.astimezone(timezone.utc)
+    # Stored timestamps are naive UTC
+    return cursor.replace(tzinfo=None)
+
+
+def delta_start(since: str) -> datetime:
+    """Oldest timestamp a delta for the cursor has to include"""
+    return parse_cursor(since) - SYNC_OVERLAP
+
+
+def order_delta(
+    db: Session, query: Query, since: str, *membership, with_person: bool = False, tombstone_scope: tuple = ()
+) -> dict:
+    """
+    Orders of a list view that changed after the cursor.
+
+    query selects every order the view could show (e.g. one person's orders)
+    and membership holds the extra criteria an order must meet to be listed
+    (e.g. status == "pending"). Returns the OrderDelta shape: orders updated
+    since the cursor that are in the list, plus the ids of orders that were
+    updated out of it (accepted, cancelled, ...) or deleted by a merge.
+
+    Deleted orders can no longer be matched against query, so views narrower
+    than the whole tenant pass tombstone_scope, criteria on OrderEvent that
+    select their own tombstones (e.g. OrderEvent.person_id == person_id).
+    Without it, removed lists every order merged away in the tenant.
+    """
+    delta, _ = order_delta_with_latest(
+        db, query, since, *membership, with_person=with_person, tombstone_scope=tombstone_scope
+    )
+    return delta
+
+
+def order_delta_with_latest(
+    db: Session, query: Query, since: str, *membership, with_person: bool = False, tombstone_scope: tuple = ()
+):
+    """order_delta(), plus the newest change timestamp in it (None when it is empty)"""
+    cursor = new_cursor()
+    start = delta_start(since)
+    updated = Order.updated_at > start
+    stamps = []
+
+    changed = load_order_rows(db, query.filter(updated, *membership), with_person=with_person)
+    stamps.extend(order["updated_at"] for order in changed)
+
+    removed = []
+    if membership:
+        left = query.filter(updated, not_(and_(*membership))).with_entities(Order.id, Order.updated_at)
+        for order_id, updated_at in left:
+            removed.append(order_id)
+            stamps.append(updated_at)
+
+    tombstones = (
+        db.query(OrderEvent.order_id, OrderEvent.created_at)
+        .filter(OrderEvent.status.in_(TOMBSTONE_STATUSES), OrderEvent.created_at > start, *tombstone_scope)
+    )
+    for order_id, created_at in tombstones:
+        removed.append(order_id)
+        stamps.append(created_at)
+
+    delta = {"cursor": cursor, "changed": changed, "removed": sorted(set(removed))}
+    return delta, max(stamps, default=None)
@@ -0,0 +1,109 @@
+import csv
+import os
+import threading
+import time
+from typing import Dict, List
+
+from ..database import Order, db_manager
+from .bills import prime_bill_settings
+from .menu import prime_menu
+from .order_rows import load_order_rows
+
+# Longest the lifespan waits for the tenant warm-up before serving anyway;
+# hotels still warming finish in the background while /health/ready says 503
+WARM_UP_TIMEOUT = float(os.getenv("TABBLE_WARM_UP_TIMEOUT", "30"))
+
+
+def hotel_databases(path: str = "hotels.csv") -> List[str]:
+    """Database names listed in hotels.csv, in file order"""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as file:
+        return list(dict.fromkeys(row["hotel_database"] for row in csv.DictReader(file)))
+
+
+def warm_up_tenant(database_name: str):
+    """
+    Do the work a hotel's first request would otherwise pay for.
+
+    Opening the shared connection creates the engine and runs the schema
+    checks; the queries below fill the menu and bill settings caches and
+    leave the statements behind the menu and order lists compiled in the
+    engine's statement cache, with the database pages they read in the OS
+    page cache.
+    """
+    connection = db_manager.get_connection(database_name)
+    db = connection['session_factory']()
+    try:
+        prime_menu(db)
+        prime_bill_settings(db)
+        load_order_rows(db, db.query(Order).filter(Order.status == "pending"), with_person=True)
+    finally:
+        db.close()
+
+
+class TenantWarmUp:
+    """
+    Warms every hotel of hotels.csv up in a background thread and reports progress.
+
+    The state is "idle" until start() is called (warm-up disabled), then
+    "warming", then "ready" once every hotel was tried. A hotel that fails
+    is reported and skipped; it is opened on its first request as before.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.state = "idle"
+        self.databases: List[str] = []
+        self.warm: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.seconds = None
+
+    def start(self):
+        with self.lock:
+            if self.state != "idle":
+                return
+            self.state = "warming"
+            self.databases = hotel_databases()
+        threading.Thread(target=self._run, name="tenant-warm-up", daemon=True).start()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the warm-up is done or timeout seconds passed; True when done"""
+        return self.done.wait(timeout)
+
+    def _run(self):
+        started = time.perf_counter()
+        for database_name in self.databases:
+            try:
+                warm_up_tenant(database_name)
+            except Exception as e:
+                print(f"Warm-up of {database_name} failed: {e}")
+                with self.lock:
+                    self.failed[database_name] = str(e)
+            else:
+                with self.lock:
+                    self.warm.append(database_name)
+        with self.lock:
+            self.seconds = round(time.perf_counter() - started, 3)
+            self.state = "ready"
+        self.done.set()
+        print(f"Warmed up {len(self.warm)} of {len(self.databases)} hotel databases in {self.seconds:.2f}s")
+
+    @property
+    def ready(self) -> bool:
+        return self.state != "warming"
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "status": "warming" if self.state == "warming" else "ready",
+                "warm_up": self.state,
+                "hotels": len(self.databases),
+                "warm": len(self.warm),
+                "failed": dict(self.failed),
+                "seconds": self.seconds,
+            }
+
+
+tenant_warm_up = TenantWarmUp()
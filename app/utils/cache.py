@@ -0,0 +1,103 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .invalidation import cache_bus
+
+
+def tenant_key(db: Union[Session, Engine]) -> str:
+    """Identify the tenant behind a session (or engine) by its database file"""
+    bind = db.get_bind() if isinstance(db, Session) else db
+    return bind.url.database or ""
+
+
+# Every TenantCache created, for the metrics endpoint
+caches: List["TenantCache"] = []
+
+
+class TenantCache:
+    """
+    Small in-process cache partitioned by tenant database.
+
+    Entries live until they are invalidated explicitly by the code that
+    writes the underlying rows, so every cached value needs a matching
+    invalidate() call on its write path. Invalidations are also published
+    on the cache bus, so other worker processes drop the tenant's entries.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        caches.append(self)
+        cache_bus.subscribe(name, self._drop)
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, Hashable], Any] = {}
+        self.generations: Dict[str, int] = {}  # Bumped on every invalidation of a tenant
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant: str, key: Hashable, default=None):
+        with self.lock:
+            try:
+                value = self.entries[(tenant, key)]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, tenant: str, key: Hashable, value: Any):
+        cache_bus.watch(tenant)
+        with self.lock:
+            self.entries[(tenant, key)] = value
+
+    def get_or_load(self, tenant: str, key: Hashable, loader: Callable[[], Any]):
+        """Return the cached value, calling loader() to fill it on a miss"""
+        sentinel = object()
+        value = self.get(tenant, key, sentinel)
+        if value is sentinel:
+            cache_bus.watch(tenant)
+            generation = self.generation(tenant)
+            value = loader()
+            with self.lock:
+                # Don't store a value loaded before a concurrent invalidation
+                if self.generations.get(tenant, 0) == generation:
+                    self.entries[(tenant, key)] = value
+        return value
+
+    def generation(self, tenant: str) -> int:
+        with self.lock:
+            return self.generations.get(tenant, 0)
+
+    def invalidate(self, tenant: str, key: Hashable = None):
+        """Drop one key of a tenant, or all of its keys when key is None, in every worker"""
+        self._drop(tenant, key)
+        # Other workers drop all of the tenant's entries of this cache
+        cache_bus.publish(tenant, self.name)
+
+    def _drop(self, tenant: str, key: Hashable = None):
+        with self.lock:
+            self.generations[tenant] = self.generations.get(tenant, 0) + 1
+            if key is not None:
+                self.entries.pop((tenant, key), None)
+            else:
+                for entry in [k for k in self.entries if k[0] == tenant]:
+                    del self.entries[entry]
+
+    def clear(self):
+        with self.lock:
+            for tenant in {entry[0] for entry in self.entries}:
+                self.generations[tenant] = self.generations.get(tenant, 0) + 1
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0,
+            }
@@ -0,0 +1,88 @@
+import gzip
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Compression settings, overridable through the environment
+COMPRESS_MIN_SIZE = int(os.getenv("TABBLE_COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("TABBLE_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("TABBLE_BROTLI_QUALITY", "4"))
+
+# Levels for bodies compressed once and then cached
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 11
+
+# Media types worth compressing; images, fonts and archives already are
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Parse an Accept-Encoding header into the set of encodings not refused with q=0"""
+    encodings = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        token = token.strip().lower()
+        if token:
+            encodings.add(token)
+    return encodings
+
+
+def choose_encoding(accept_encoding: str):
+    """Best supported encoding for a request: br, then gzip, else None"""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Compress a complete body; cached=True spends more CPU for a smaller result"""
+    if encoding == "br":
+        return brotli.compress(data, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for streamed bodies; every chunk is flushed"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = self.compressor.process
+            self._flush = self.compressor.flush
+            self._finish = self.compressor.finish
+        else:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress = self.compressor.compress
+            self._flush = lambda: self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self.compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..database import Dish
+from ..services.menu import invalidate_menu
+
+# Variant name -> target width in pixels. Each one is written as JPEG and WebP.
+IMAGE_VARIANT_WIDTHS = {
+    "thumbnail": 320,
+    "medium": 640,
+}
+JPEG_QUALITY = 80
+WEBP_QUALITY = 78
+
+IMAGE_WORKERS = int(os.getenv("TABBLE_IMAGE_WORKERS", "2"))
+
+STATIC_URL_PREFIX = "/static/"
+STATIC_ROOT = "app/static"
+
+
+def static_url_to_path(url: str) -> Optional[str]:
+    """Map a /static/... URL to its file under app/static"""
+    if not url or not url.startswith(STATIC_URL_PREFIX):
+        return None
+    return os.path.join(STATIC_ROOT, url[len(STATIC_URL_PREFIX):])
+
+
+def _variant_name(url: str, name: str, extension: str) -> str:
+    stem = os.path.splitext(url)[0]
+    return f"{stem}_{name}{extension}"
+
+
+def _save_atomically(image: Image.Image, path: str, **options):
+    temp_path = f"{path}.part"
+    image.save(temp_path, **options)
+    os.replace(temp_path, path)
+
+
+def _resize(image: Image.Image, width: int) -> Image.Image:
+    # Never upscale: small originals keep their size, only the encoding changes
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode == "RGB":
+        return image
+    # JPEG has no alpha: flatten onto white
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def generate_image_variants(image_url: str) -> Dict[str, str]:
+    """
+    Write the resized JPEG and WebP variants of a stored image beside it.
+
+    Returns variant key -> URL, e.g. {"thumbnail": ".../x_thumbnail.jpg",
+    "thumbnail_webp": ".../x_thumbnail.webp", ...}. Variants that already
+    exist are reused, which makes this cheap for content-addressed images.
+    """
+    source_path = static_url_to_path(image_url)
+    if source_path is None or not os.path.exists(source_path):
+        return {}
+
+    variants = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for name, width in IMAGE_VARIANT_WIDTHS.items():
+            jpeg_url = _variant_name(image_url, name, ".jpg")
+            webp_url = _variant_name(image_url, name, ".webp")
+            jpeg_path = static_url_to_path(jpeg_url)
+            webp_path = static_url_to_path(webp_url)
+
+            if not (os.path.exists(jpeg_path) and os.path.exists(webp_path)):
+                resized = _resize(image, width)
+                if not os.path.exists(webp_path):
+                    _save_atomically(resized, webp_path, format="WEBP", quality=WEBP_QUALITY, method=4)
+                if not os.path.exists(jpeg_path):
+                    _save_atomically(_to_rgb(resized), jpeg_path, format="JPEG", quality=JPEG_QUALITY,
+                                     optimize=True, progressive=True)
+
+            variants[name] = jpeg_url
+            variants[f"{name}_webp"] = webp_url
+
+    return variants
+
+
+def _update_dish_variants(engine: Engine, dish_id: int, image_url: str):
+    try:
+        variants = generate_image_variants(image_url)
+    except Exception as e:
+        print(f"Error generating image variants for {image_url}: {e}")
+        return
+
+    db = Session(bind=engine)
+    try:
+        # Only if the dish still shows this image; it may have been replaced meanwhile
+        db.query(Dish).filter(Dish.id == dish_id, Dish.image_path == image_url).update(
+            {Dish.image_variants: json.dumps(variants) if variants else None},
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    # The menu responses embed the variant URLs
+    invalidate_menu(engine)
+
+
+class ImageVariantWorker:
+    """Background threads that build dish image variants after an upload"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=max(self.workers, 1),
+                                                   thread_name_prefix="image-variants")
+            return self.executor
+
+    def schedule_dish(self, engine: Engine, dish_id: int, image_url: str):
+        """Generate the variants of a dish image and store their URLs on the dish"""
+        if self.workers <= 0:
+            _update_dish_variants(engine, dish_id, image_url)
+            return
+        self._get_executor().submit(_update_dish_variants, engine, dish_id, image_url)
+
+    def shutdown(self, wait: bool = True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Global image variant worker
+image_variant_worker = ImageVariantWorker(IMAGE_WORKERS)
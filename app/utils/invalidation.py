@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+
+# Share cache invalidations between worker processes through the tenant
+# databases (set by `run.py --production` when it starts several workers)
+CACHE_BUS = os.getenv("TABBLE_CACHE_BUS", "0") == "1"
+
+# How often each worker looks for changes made by the others, in seconds;
+# this bounds how stale a cache can be after another worker's write
+CACHE_BUS_INTERVAL = float(os.getenv("TABBLE_CACHE_BUS_INTERVAL_MS", "500")) / 1000
+
+VERSIONS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS cache_versions ("
+    "name TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID"
+)
+
+
+def _connect(tenant: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(tenant, timeout=5, isolation_level=None)
+    connection.execute(VERSIONS_TABLE)
+    return connection
+
+
+class InvalidationBus:
+    """
+    Broadcasts "cache X of tenant T is stale" between worker processes.
+
+    Each tenant database holds a cache_versions table with one counter per
+    cache name. Publishing bumps the counter. A watcher thread in every
+    worker polls PRAGMA data_version on its own connection to each watched
+    tenant, which only changes once another connection commits, so an idle
+    tenant costs one cheap pragma per interval. When it changes, the
+    counters are read and the subscribers of every name that moved are
+    called. Change subscribers are called on any commit, for state (like
+    long-poll waiters) that has to react to writes in general.
+    """
+
+    def __init__(self, enabled: bool = CACHE_BUS, interval: float = CACHE_BUS_INTERVAL):
+        self.enabled = enabled
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.subscribers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self.change_subscribers: List[Callable[[str], None]] = []
+        self.tenants: Set[str] = set()
+        self.seen: Dict[Tuple[str, str], int] = {}  # (tenant, name) -> last version acted on
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def subscribe(self, name: str, callback: Callable[[str], None]):
+        """Call callback(tenant) when another worker publishes name for a tenant"""
+        with self.lock:
+            self.subscribers[name].append(callback)
+
+    def subscribe_changes(self, callback: Callable[[str], None]):
+        """Call callback(tenant) after any commit to a watched tenant by another connection"""
+        with self.lock:
+            self.change_subscribers.append(callback)
+
+    def watch(self, tenant: str):
+        """Start following a tenant database; cheap to call repeatedly"""
+        if not self.enabled or not tenant or tenant in self.tenants:
+            return
+        with self.lock:
+            self.tenants.add(tenant)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="cache-invalidation-bus", daemon=True)
+                self.thread.start()
+
+    def publish(self, tenant: str, name: str):
+        """Tell the other workers that cache name of tenant is stale"""
+        if not self.enabled or not tenant:
+            return
+        connection = _connect(tenant)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO cache_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET version = version + 1", (name,))
+            version = connection.execute("SELECT version FROM cache_versions WHERE name = ?", (name,)).fetchone()[0]
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+        with self.lock:
+            # This process has already invalidated locally; skip our own bump
+            # unless another worker's bump is still waiting to be seen
+            if self.seen.get((tenant, name)) == version - 1:
+                self.seen[(tenant, name)] = version
+
+    def _run(self):
+        connections: Dict[str, sqlite3.Connection] = {}
+        data_versions: Dict[str, int] = {}
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                tenants = list(self.tenants)
+            for tenant in tenants:
+                try:
+                    connection = connections.get(tenant)
+                    if connection is None:
+                        connection = connections[tenant] = _connect(tenant)
+                    data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+                    if data_versions.get(tenant) == data_version:
+                        continue
+                    data_versions[tenant] = data_version
+                    versions = connection.execute("SELECT name, version FROM cache_versions").fetchall()
+                    self._dispatch(tenant, versions)
+                except sqlite3.Error as e:
+                    print(f"Cache invalidation bus could not read {tenant}: {e}")
+        for connection in connections.values():
+            connection.close()
+
+    def _dispatch(self, tenant: str, versions: List[Tuple[str, int]]):
+        # The first read of a tenant counts every counter as moved: a bump
+        # made between watch() and that read must not be missed, and an
+        # extra miss right after startup is cheap
+        stale = []
+        with self.lock:
+            for name, version in versions:
+                if self.seen.get((tenant, name)) != version:
+                    self.seen[(tenant, name)] = version
+                    stale.extend(self.subscribers.get(name, []))
+            stale.extend(self.change_subscribers)
+        for callback in stale:
+            try:
+                callback(tenant)
+            except Exception as e:
+                print(f"Cache invalidation callback failed for {tenant}: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+cache_bus = InvalidationBus()
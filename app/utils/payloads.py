@@ -0,0 +1,59 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+from .compression import COMPRESS_MIN_SIZE, choose_encoding, compress
+
+
+class CachedPayload:
+    """
+    A JSON response body serialized once, with its compressed forms.
+
+    Each encoding is computed at most once per payload (on first request
+    for it), so cached endpoints pay for compression once per version of
+    the data instead of on every request.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # Weak: the same ETag covers every content encoding of the body
+        self.etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.lock = threading.Lock()
+        self.encoded: Dict[str, bytes] = {}
+
+    def encoded_body(self, encoding: str) -> bytes:
+        with self.lock:
+            if encoding not in self.encoded:
+                self.encoded[encoding] = compress(self.body, encoding, cached=True)
+            return self.encoded[encoding]
+
+
+def build_payload(data: Any) -> CachedPayload:
+    """Serialize data the way FastAPI would into a CachedPayload; bytes are taken as JSON already"""
+    if isinstance(data, bytes):
+        return CachedPayload(data)
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return CachedPayload(body)
+
+
+def payload_response(request: Request, payload: CachedPayload) -> Response:
+    """Respond with a cached payload: 304 on a matching ETag, else the best encoding"""
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if payload.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    body = payload.body
+    if len(body) >= COMPRESS_MIN_SIZE:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            body = payload.encoded_body(encoding)
+            headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
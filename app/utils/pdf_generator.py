@@ -1,48 +1,86 @@
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+# ReportLab is imported on first render, not with this module: building
+# bills, hashing and caching them needs none of it, and with the render pool
+# only the worker processes ever draw a PDF
+from collections import OrderedDict
+from functools import lru_cache
 from io import BytesIO
 from datetime import datetime
-from typing import List
-
-def generate_bill_pdf(order, settings):
-    """
-    Generate a PDF bill for a single order
-
-    Args:
-        order: The order object with all details
-        settings: The hotel settings object
-
-    Returns:
-        BytesIO: A buffer containing the PDF data
-    """
-    # Convert single order to list and use the multi-order function
-    return generate_multi_order_bill_pdf([order], settings)
-
-def generate_multi_order_bill_pdf(orders: List, settings):
+from typing import List, Optional
+import hashlib
+import json
+import threading
+
+# Points per inch (reportlab.lib.units.inch)
+inch = 72.0
+
+# Use a narrower page size to mimic a receipt
+PAGE_SIZE = (4*inch, 11*inch)  # Typical receipt width
+PAGE_MARGIN = 10
+FRAME_WIDTH = PAGE_SIZE[0] - 2 * PAGE_MARGIN
+
+# Column widths of the item and totals tables
+ITEM_COL_WIDTHS = [FRAME_WIDTH*0.4, FRAME_WIDTH*0.15, FRAME_WIDTH*0.2, FRAME_WIDTH*0.25]
+TOTALS_COL_WIDTHS = [FRAME_WIDTH*0.4, FRAME_WIDTH*0.35, FRAME_WIDTH*0.25]
+BILL_INFO_COL_WIDTHS = [FRAME_WIDTH/2-20, FRAME_WIDTH/2-20]
+
+TAGLINE = "AN AUTHENTIC CUISINE SINCE 2000"
+# License info and thank you message
+FOOTER_LINES = ["FSSAI Lic No: 12018033000205", "!!! Thank You !!! Visit Again !!!"]
+SEPARATOR = "_" * 50
+# Tax (assuming 5% CGST and 5% SGST)
+TAX_RATE = 0.05
+
+# Finished PDFs of paid orders, keyed by (order ids, content hash)
+PDF_CACHE_SIZE = 256
+_pdf_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+_pdf_cache_counts = {"hits": 0, "misses": 0}
+
+
+@lru_cache(maxsize=1)
+def get_table_styles() -> dict:
+    """The receipt table styles by name; they never change, so they are built once per process"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return {
+        "bill_info": TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (1, 0), 0.5, colors.black),
+        ]),
+        "items_header": TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica-Bold', 8),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
+        ]),
+        "items": TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ]),
+        "totals": TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+        ]),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_bill_styles():
     """
-    Generate a PDF bill for multiple orders in a receipt-like format
-
-    Args:
-        orders: List of order objects with all details
-        settings: The hotel settings object
+    Build the receipt paragraph styles.
 
-    Returns:
-        BytesIO: A buffer containing the PDF data
+    The styles do not depend on the hotel, so they are built once per process
+    and shared by every bill.
     """
-    buffer = BytesIO()
-    # Use a narrower page size to mimic a receipt
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=(4*inch, 11*inch),  # Typical receipt width
-        rightMargin=10,
-        leftMargin=10,
-        topMargin=10,
-        bottomMargin=10
-    )
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 
-    # Create styles
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(
         name='HotelName',
@@ -110,143 +148,293 @@ def generate_multi_order_bill_pdf(orders: List, settings):
         alignment=1,  # Center alignment
         textColor=colors.black
     ))
+    return styles
+
+
+def snapshot_settings(settings) -> dict:
+    """Copy the hotel settings fields used on a bill into a plain dict"""
+    return {
+        "hotel_name": settings.hotel_name,
+        "address": settings.address,
+        "contact_number": settings.contact_number,
+        "tax_id": settings.tax_id,
+    }
+
+
+def snapshot_order(order) -> dict:
+    """Copy an order and its items into a plain dict for bill rendering"""
+    items = []
+    for item in order.items:
+        # Bill at the price captured when the item was ordered
+        if item.unit_price is not None:
+            price = item.unit_price
+        else:
+            price = item.dish.price if item.dish else 0
 
-    # Create content elements
-    elements = []
-
-    # We're not using the logo in this receipt-style bill
-    # Add hotel name and info
-    elements.append(Paragraph(settings.hotel_name.upper(), styles['HotelName']))
+        items.append({
+            "name": item.dish.name if item.dish else "Unknown Dish",
+            "quantity": item.quantity,
+            "unit_price": price,
+        })
+
+    return {
+        "id": order.id,
+        "table_number": order.table_number,
+        "status": order.status,
+        "person_name": getattr(order, "person_name", None) or "",
+        "items": items,
+    }
+
+
+@lru_cache(maxsize=64)
+def _header_lines(hotel_name: str, address: Optional[str], contact_number: Optional[str], tax_id: Optional[str]):
+    """Hotel header lines as (text, style name) pairs, cached per settings version"""
+    lines = [
+        (hotel_name.upper(), 'HotelName'),
+        (TAGLINE, 'HotelTagline'),
+    ]
+    if address:
+        lines.append((address, 'HotelAddress'))
+    if contact_number:
+        lines.append((f"Contact: {contact_number}", 'HotelAddress'))
+    if tax_id:
+        lines.append((f"GSTIN: {tax_id}", 'HotelAddress'))
+    return tuple(lines)
 
-    # Add tagline (if any, otherwise use a default)
-    tagline = "AN AUTHENTIC CUISINE SINCE 2000"
-    elements.append(Paragraph(tagline, styles['HotelTagline']))
 
-    # Add address with formatting similar to the image
-    if settings.address:
-        elements.append(Paragraph(settings.address, styles['HotelAddress']))
+def build_bill(orders: List[dict], settings: dict, printed_at: Optional[datetime] = None) -> dict:
+    """
+    Compute everything printed on a bill from order and settings snapshots.
 
-    # Add contact info
-    if settings.contact_number:
-        elements.append(Paragraph(f"Contact: {settings.contact_number}", styles['HotelAddress']))
+    The result is plain data, so it can be hashed, pickled to another process
+    or rendered by any receipt renderer.
 
-    # Add tax ID (GSTIN)
-    if settings.tax_id:
-        elements.append(Paragraph(f"GSTIN: {settings.tax_id}", styles['HotelAddress']))
+    Args:
+        orders: Order snapshots from snapshot_order()
+        settings: Settings snapshot from snapshot_settings()
+        printed_at: Time printed on the bill, defaults to now
 
-    # Add a separator line
-    elements.append(Paragraph("_" * 50, styles['HotelAddress']))
+    Returns:
+        dict: The bill content
+    """
+    printed_at = printed_at or datetime.now()
 
-    # Add bill details in a more receipt-like format
     # Use the first order for common details
     first_order = orders[0]
 
-    # Create a table for the bill header info
-    # Get customer name if available
-    customer_name = ""
-    if hasattr(first_order, 'person_name') and first_order.person_name:
-        customer_name = first_order.person_name
+    item_groups = []
+    total_items = 0
+    grand_total = 0
 
-    bill_info_data = [
-        ["Name:", customer_name],
-        [f"Date: {datetime.now().strftime('%d/%m/%y')}", f"Dine In: {first_order.table_number}"],
-        [f"{datetime.now().strftime('%H:%M')}", f"Bill No.: {first_order.id}"]
-    ]
+    for order in orders:
+        rows = []
+        for item in order["items"]:
+            total = item["unit_price"] * item["quantity"]
+            grand_total += total
+            total_items += item["quantity"]
+            rows.append([
+                item["name"],
+                str(item["quantity"]),
+                f"{item['unit_price']:.2f}",
+                f"{total:.2f}"
+            ])
+        item_groups.append(rows)
 
-    bill_info_table = Table(bill_info_data, colWidths=[doc.width/2-20, doc.width/2-20])
-    bill_info_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('LINEBELOW', (0, 0), (1, 0), 0.5, colors.black),
-    ]))
+    cgst = grand_total * TAX_RATE
+    sgst = grand_total * TAX_RATE
+    subtotal = grand_total - cgst - sgst
 
-    elements.append(bill_info_table)
-    elements.append(Paragraph("_" * 50, styles['HotelAddress']))
+    return {
+        "order_ids": [order["id"] for order in orders],
+        # Paid orders can no longer change, so their bills are safe to cache
+        "cacheable": all(order["status"] == "paid" for order in orders),
+        "header": [list(line) for line in _header_lines(
+            settings["hotel_name"], settings["address"], settings["contact_number"], settings["tax_id"]
+        )],
+        "customer_name": first_order["person_name"],
+        "table_number": first_order["table_number"],
+        "bill_no": first_order["id"],
+        "date": printed_at.strftime('%d/%m/%y'),
+        "time": printed_at.strftime('%H:%M'),
+        "item_groups": item_groups,
+        "total_items": total_items,
+        "subtotal": subtotal,
+        "cgst": cgst,
+        "sgst": sgst,
+        "grand_total": grand_total,
+        "footer": FOOTER_LINES,
+    }
+
+
+def bill_content_hash(bill: dict) -> str:
+    """Hash of the bill content, ignoring the time it is printed at"""
+    content = {key: value for key, value in bill.items() if key not in ("date", "time")}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def render_bill_pdf(bill: dict) -> bytes:
+    """
+    Render a bill built by build_bill() as a receipt-like PDF
 
-    # Create header for items table
-    items_header = [["Item", "Qty.", "Price", "Amount"]]
-    items_header_table = Table(items_header, colWidths=[doc.width*0.4, doc.width*0.15, doc.width*0.2, doc.width*0.25])
-    items_header_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica-Bold', 8),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-        ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
-    ]))
+    Returns:
+        bytes: The PDF data
+    """
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
 
-    elements.append(items_header_table)
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=PAGE_SIZE,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN
+    )
+    styles = get_bill_styles()
+    table_styles = get_table_styles()
 
-    # Add all order items
-    total_items = 0
-    grand_total = 0
+    # Create content elements
+    elements = []
 
-    for order in orders:
-        order_data = []
+    # We're not using the logo in this receipt-style bill
+    # Add hotel name, tagline, address, contact info and tax ID (GSTIN)
+    for text, style_name in bill["header"]:
+        elements.append(Paragraph(text, styles[style_name]))
 
-        for item in order.items:
-            dish_name = item.dish.name if item.dish else "Unknown Dish"
-            price = item.dish.price if item.dish else 0
-            quantity = item.quantity
-            total = price * quantity
-            grand_total += total
-            total_items += quantity
+    # Add a separator line
+    elements.append(Paragraph(SEPARATOR, styles['HotelAddress']))
 
-            order_data.append([
-                dish_name,
-                str(quantity),
-                f"{price:.2f}",
-                f"{total:.2f}"
-            ])
+    # Create a table for the bill header info
+    bill_info_data = [
+        ["Name:", bill["customer_name"]],
+        [f"Date: {bill['date']}", f"Dine In: {bill['table_number']}"],
+        [bill["time"], f"Bill No.: {bill['bill_no']}"]
+    ]
+    bill_info_table = Table(bill_info_data, colWidths=BILL_INFO_COL_WIDTHS)
+    bill_info_table.setStyle(table_styles["bill_info"])
 
-        # Create the table for this order's items
-        if order_data:
-            items_table = Table(order_data, colWidths=[doc.width*0.4, doc.width*0.15, doc.width*0.2, doc.width*0.25])
-            items_table.setStyle(TableStyle([
-                ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ]))
+    elements.append(bill_info_table)
+    elements.append(Paragraph(SEPARATOR, styles['HotelAddress']))
+
+    # Create header for items table
+    items_header_table = Table([["Item", "Qty.", "Price", "Amount"]], colWidths=ITEM_COL_WIDTHS)
+    items_header_table.setStyle(table_styles["items_header"])
+    elements.append(items_header_table)
 
+    # Add all order items, one table per order
+    for rows in bill["item_groups"]:
+        if rows:
+            items_table = Table(rows, colWidths=ITEM_COL_WIDTHS)
+            items_table.setStyle(table_styles["items"])
             elements.append(items_table)
 
     # Add a separator line
-    elements.append(Paragraph("_" * 50, styles['HotelAddress']))
+    elements.append(Paragraph(SEPARATOR, styles['HotelAddress']))
 
     # Add totals section
-    # Calculate tax (assuming 5% CGST and 5% SGST like in the image)
-    tax_rate = 0.05  # 5%
-    cgst = grand_total * tax_rate
-    sgst = grand_total * tax_rate
-    subtotal = grand_total - cgst - sgst
-
     totals_data = [
-        [f"Total Qty: {total_items}", f"Sub Total", f"{subtotal:.2f}"],
-        ["", f"CGST", f"{cgst:.2f}"],
-        ["", f"SGST", f"{sgst:.2f}"],
+        [f"Total Qty: {bill['total_items']}", "Sub Total", f"{bill['subtotal']:.2f}"],
+        ["", "CGST", f"{bill['cgst']:.2f}"],
+        ["", "SGST", f"{bill['sgst']:.2f}"],
     ]
-
-    totals_table = Table(totals_data, colWidths=[doc.width*0.4, doc.width*0.35, doc.width*0.25])
-    totals_table.setStyle(TableStyle([
-        ('FONT', (0, 0), (-1, -1), 'Helvetica', 8),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-    ]))
-
+    totals_table = Table(totals_data, colWidths=TOTALS_COL_WIDTHS)
+    totals_table.setStyle(table_styles["totals"])
     elements.append(totals_table)
 
     # Add grand total with emphasis
-    elements.append(Paragraph("_" * 50, styles['HotelAddress']))
-    elements.append(Paragraph(f"Grand Total    ${grand_total:.2f}", styles['Total']))
-    elements.append(Paragraph("_" * 50, styles['HotelAddress']))
+    elements.append(Paragraph(SEPARATOR, styles['HotelAddress']))
+    elements.append(Paragraph(f"Grand Total    ${bill['grand_total']:.2f}", styles['Total']))
+    elements.append(Paragraph(SEPARATOR, styles['HotelAddress']))
 
     # Add license info and thank you message
     elements.append(Spacer(1, 5))
-    elements.append(Paragraph("FSSAI Lic No: 12018033000205", styles['Footer']))
-    elements.append(Paragraph("!!! Thank You !!! Visit Again !!!", styles['Footer']))
+    for line in bill["footer"]:
+        elements.append(Paragraph(line, styles['Footer']))
 
     # Build the PDF
     doc.build(elements)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def get_cached_bill_pdf(bill: dict) -> Optional[bytes]:
+    """Return the cached PDF for a paid bill, if it has been rendered before"""
+    if not bill["cacheable"]:
+        return None
+    key = (tuple(bill["order_ids"]), bill_content_hash(bill))
+    with _pdf_cache_lock:
+        pdf = _pdf_cache.get(key)
+        if pdf is not None:
+            _pdf_cache.move_to_end(key)
+            _pdf_cache_counts["hits"] += 1
+        else:
+            _pdf_cache_counts["misses"] += 1
+        return pdf
+
+
+def cache_bill_pdf(bill: dict, pdf: bytes):
+    """Remember the PDF of a paid bill, evicting the least recently used one"""
+    if not bill["cacheable"]:
+        return
+    key = (tuple(bill["order_ids"]), bill_content_hash(bill))
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+
+
+def pdf_cache_stats() -> dict:
+    """Hit and miss counts of the paid bill cache, shaped like TenantCache.stats()"""
+    with _pdf_cache_lock:
+        hits, misses = _pdf_cache_counts["hits"], _pdf_cache_counts["misses"]
+        total = hits + misses
+        return {
+            "name": "bill_pdf",
+            "entries": len(_pdf_cache),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0,
+        }
+
+
+def render_bill_pdf_cached(bill: dict) -> bytes:
+    """
+    Render a bill, reusing the finished PDF for paid orders.
+
+    A reprinted paid bill keeps the date and time of its first printing.
+    """
+    pdf = get_cached_bill_pdf(bill)
+    if pdf is None:
+        pdf = render_bill_pdf(bill)
+        cache_bill_pdf(bill, pdf)
+    return pdf
 
-    return buffer
+
+def generate_bill_pdf(order, settings):
+    """
+    Generate a PDF bill for a single order
+
+    Args:
+        order: The order object with all details
+        settings: The hotel settings object
+
+    Returns:
+        BytesIO: A buffer containing the PDF data
+    """
+    # Convert single order to list and use the multi-order function
+    return generate_multi_order_bill_pdf([order], settings)
+
+
+def generate_multi_order_bill_pdf(orders: List, settings):
+    """
+    Generate a PDF bill for multiple orders in a receipt-like format
+
+    Args:
+        orders: List of order objects with all details
+        settings: The hotel settings object
+
+    Returns:
+        BytesIO: A buffer containing the PDF data
+    """
+    bill = build_bill([snapshot_order(order) for order in orders], snapshot_settings(settings))
+    return BytesIO(render_bill_pdf_cached(bill))
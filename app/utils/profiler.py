@@ -0,0 +1,155 @@
+import collections
+import os
+import secrets
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+# Shared secret for the profiler endpoints and the X-Profile header; unset disables profiling
+PROFILER_TOKEN = os.getenv("TABBLE_PROFILER_TOKEN", "")
+
+# Default time between two samples of every thread's stack
+PROFILER_INTERVAL = float(os.getenv("TABBLE_PROFILER_INTERVAL_MS", "5")) / 1000
+
+# Longest on-demand profile, in seconds
+PROFILER_MAX_SECONDS = 60
+
+# Profiled requests kept for download, and how many may be profiled at once
+REQUEST_PROFILES_KEPT = 50
+REQUEST_PROFILE_SLOTS = 4
+
+# Leaf frames of threads that are blocked waiting for work, left out unless asked for
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+_PATH_MARKERS = ("site-packages" + os.sep, "dist-packages" + os.sep)
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def token_matches(token: str) -> bool:
+    """Whether token is the profiler token; always False while profiling is disabled"""
+    return bool(PROFILER_TOKEN) and secrets.compare_digest(token, PROFILER_TOKEN)
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code) -> str:
+    """'function (short/path.py:first line)' - one label per function, not per line"""
+    filename = code.co_filename
+    for marker in _PATH_MARKERS:
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        for prefix in (_STDLIB, os.getcwd() + os.sep):
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):]
+                break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+class StackSampler(threading.Thread):
+    """
+    Statistical profiler over every thread of the process.
+
+    Every interval it reads the current frame of each thread with
+    sys._current_frames() and counts the collapsed stack, root first.
+    Nothing is traced between samples, so the profiled code runs at full
+    speed; the cost is one stack walk per thread per sample, paid by the
+    sampler thread.
+    """
+
+    def __init__(self, interval: float = PROFILER_INTERVAL, include_idle: bool = False, ignore: Iterable[int] = ()):
+        super().__init__(name="tabble-profiler", daemon=True)
+        self.interval = interval
+        self.include_idle = include_idle
+        self.ignore = set(ignore)  # Thread idents left out of the samples
+        self.samples: collections.Counter = collections.Counter()
+        self.sample_count = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        ignore = self.ignore | {threading.get_ident()}
+        names: Dict[int, str] = {}
+        while not self.stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident in ignore or (not self.include_idle and _is_idle(frame)):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def stop(self) -> collections.Counter:
+        self.stop_event.set()
+        self.join()
+        return self.samples
+
+
+def collapsed(samples: collections.Counter) -> str:
+    """Samples in the collapsed-stack format read by flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+# Only one on-demand profile runs at a time
+profile_lock = threading.Lock()
+
+
+def profile_threads(seconds: float, interval: float = PROFILER_INTERVAL, include_idle: bool = False) -> str:
+    """Sample every other thread for seconds and return the collapsed stacks (blocks the caller)"""
+    sampler = StackSampler(interval, include_idle, ignore=[threading.get_ident()])
+    sampler.start()
+    time.sleep(seconds)
+    return collapsed(sampler.stop())
+
+
+class RequestProfiles:
+    """The most recent per-request profiles, by id"""
+
+    def __init__(self, kept: int = REQUEST_PROFILES_KEPT, slots: int = REQUEST_PROFILE_SLOTS):
+        self.kept = kept
+        self.lock = threading.Lock()
+        self.profiles: "collections.OrderedDict[str, dict]" = collections.OrderedDict()
+        self.slots = threading.BoundedSemaphore(slots)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex[:16]
+
+    def add(self, profile_id: str, summary: dict, stacks: str):
+        with self.lock:
+            self.profiles[profile_id] = {**summary, "id": profile_id, "stacks": stacks}
+            while len(self.profiles) > self.kept:
+                self.profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self.lock:
+            return self.profiles.get(profile_id)
+
+    def summaries(self) -> list:
+        with self.lock:
+            return [
+                {key: value for key, value in profile.items() if key != "stacks"}
+                for profile in reversed(self.profiles.values())
+            ]
+
+
+request_profiles = RequestProfiles()
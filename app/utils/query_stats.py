@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import Counter
+
+# Statements slower than this are logged with their parameters; 0 disables
+SLOW_QUERY_MS = float(os.getenv("TABBLE_SLOW_QUERY_MS", "200"))
+
+# Longest parameter list representation written to the slow-query log
+SLOW_QUERY_PARAMS_CHARS = 500
+
+logger = logging.getLogger("tabble.db")
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+POOL_CHECKOUTS = Counter("tabble_db_pool_checkouts_total", "Connections checked out of tenant engine pools", ["tenant"])
+
+
+class QueryStats:
+    """Statements run and time spent in the database while serving one request"""
+
+    def __init__(self, path: str = ""):
+        self.lock = threading.Lock()  # Sync endpoints run their queries in worker threads
+        self.path = path
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.tenant: Optional[str] = None  # Also set when the request resolves its session's database
+
+    def add(self, seconds: float, tenant: str):
+        with self.lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            if tenant:
+                self.tenant = tenant
+
+
+# Set per request by QueryTimingMiddleware. The stats object is shared by
+# reference, so queries run in threads (which get a copy of the context) are
+# still counted against the request.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _tenant_of(conn) -> str:
+    return os.path.basename(conn.engine.url.database or "")
+
+
+# Listening on the Engine class covers every tenant engine, including the
+# ones DatabaseManager creates per session later on
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.add(elapsed, _tenant_of(conn))
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "path": stats.path if stats is not None else None,
+            "tenant": _tenant_of(conn),
+            "db_ms": round(elapsed * 1000, 2),
+            "statement": " ".join(statement.split()),
+            "parameters": repr(parameters)[:SLOW_QUERY_PARAMS_CHARS],
+            "executemany": executemany,
+        }))
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+@event.listens_for(Engine, "engine_connect")
+def _count_checkout(conn):
+    POOL_CHECKOUTS.inc(_tenant_of(conn))
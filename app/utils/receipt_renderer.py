@@ -0,0 +1,124 @@
+from typing import List
+
+# Characters per line of an 80mm thermal printer in its default font
+RECEIPT_WIDTH = 48
+
+# Item table columns: quantity, price and amount are right aligned
+QTY_WIDTH = 5
+PRICE_WIDTH = 9
+AMOUNT_WIDTH = 9
+
+# ESC/POS control sequences
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_DOUBLE_SIZE = b"\x1d!\x11"
+ESC_NORMAL_SIZE = b"\x1d!\x00"
+ESC_FEED_AND_CUT = b"\x1dV\x42\x03"  # Feed 3 lines, then partial cut
+
+# Most thermal printers start in code page 437
+ESCPOS_ENCODING = "cp437"
+
+
+def _two_columns(left: str, right: str, width: int) -> str:
+    """Left-align one value and right-align another on the same line"""
+    space = max(width - len(left) - len(right), 1)
+    return f"{left}{' ' * space}{right}"
+
+
+def _item_lines(row: List[str], width: int) -> List[str]:
+    """Format one item row, wrapping long dish names onto extra lines"""
+    name, quantity, price, amount = row
+    name_width = width - QTY_WIDTH - PRICE_WIDTH - AMOUNT_WIDTH
+    chunks = [name[i:i + name_width] for i in range(0, len(name), name_width)] or [""]
+
+    lines = [
+        f"{chunks[0]:<{name_width}}{quantity:>{QTY_WIDTH}}{price:>{PRICE_WIDTH}}{amount:>{AMOUNT_WIDTH}}"
+    ]
+    lines.extend(chunk for chunk in chunks[1:])
+    return lines
+
+
+def _receipt_sections(bill: dict, width: int):
+    """
+    Lay out a bill as (section, lines) pairs.
+
+    Sections are "title", "header", "body", "total" and "footer", so the
+    plain-text and ESC/POS renderers share one layout and differ only in
+    how each section is styled.
+    """
+    separator = "-" * width
+    title, *header = bill["header"]
+
+    body = [
+        separator,
+        f"Name: {bill['customer_name']}",
+        _two_columns(f"Date: {bill['date']}", f"Dine In: {bill['table_number']}", width),
+        _two_columns(bill["time"], f"Bill No.: {bill['bill_no']}", width),
+        separator,
+        _item_lines(["Item", "Qty.", "Price", "Amount"], width)[0],
+        separator,
+    ]
+    for rows in bill["item_groups"]:
+        for row in rows:
+            body.extend(_item_lines(row, width))
+
+    label_width = width - 18
+    body.extend([
+        separator,
+        f"{'Total Qty: ' + str(bill['total_items']):<18}{'Sub Total':>{label_width - 9}}{bill['subtotal']:>9.2f}",
+        f"{'':<18}{'CGST':>{label_width - 9}}{bill['cgst']:>9.2f}",
+        f"{'':<18}{'SGST':>{label_width - 9}}{bill['sgst']:>9.2f}",
+        separator,
+    ])
+
+    return [
+        ("title", [title[0]]),
+        ("header", [text for text, _ in header]),
+        ("body", body),
+        ("total", [f"Grand Total    ${bill['grand_total']:.2f}"]),
+        ("footer", [separator] + list(bill["footer"])),
+    ]
+
+
+def render_bill_text(bill: dict, width: int = RECEIPT_WIDTH) -> str:
+    """
+    Render a bill built by build_bill() as fixed-width plain text
+
+    Returns:
+        str: The receipt text, one printer line per text line
+    """
+    lines = []
+    for section, section_lines in _receipt_sections(bill, width):
+        if section == "body":
+            lines.extend(section_lines)
+        else:
+            lines.extend(line.center(width).rstrip() for line in section_lines)
+    return "\n".join(lines) + "\n"
+
+
+def render_bill_escpos(bill: dict, width: int = RECEIPT_WIDTH) -> bytes:
+    """
+    Render a bill built by build_bill() as an ESC/POS byte stream
+
+    Returns:
+        bytes: Printer commands ready to be sent to a thermal printer
+    """
+    def encode(lines):
+        return "".join(f"{line}\n" for line in lines).encode(ESCPOS_ENCODING, errors="replace")
+
+    stream = [ESC_INIT]
+    for section, section_lines in _receipt_sections(bill, width):
+        if section == "title":
+            stream += [ESC_ALIGN_CENTER, ESC_BOLD_ON, ESC_DOUBLE_SIZE,
+                       encode(section_lines), ESC_NORMAL_SIZE, ESC_BOLD_OFF]
+        elif section == "total":
+            stream += [ESC_ALIGN_CENTER, ESC_BOLD_ON, encode(section_lines), ESC_BOLD_OFF]
+        elif section == "body":
+            stream += [ESC_ALIGN_LEFT, encode(section_lines)]
+        else:
+            stream += [ESC_ALIGN_CENTER, encode(section_lines)]
+    stream.append(ESC_FEED_AND_CUT)
+    return b"".join(stream)
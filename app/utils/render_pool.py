@@ -0,0 +1,198 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from .metrics import Histogram
+from .pdf_generator import render_bill_pdf, get_cached_bill_pdf, cache_bill_pdf, get_bill_styles, get_table_styles
+
+# Pool configuration, overridable through the environment
+RENDER_WORKERS = int(os.getenv("TABBLE_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_QUEUE_LIMIT = int(os.getenv("TABBLE_RENDER_QUEUE_LIMIT", str(max(RENDER_WORKERS, 1) * 4)))
+RENDER_TIMEOUT = float(os.getenv("TABBLE_RENDER_TIMEOUT", "30"))
+
+PDF_RENDER_SECONDS = Histogram(
+    "tabble_pdf_render_seconds", "Time to render a bill PDF that was not cached, including the wait for a worker",
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class RenderQueueFull(Exception):
+    """Raised when too many renders are already queued"""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render does not finish within the timeout"""
+
+
+class RenderPool:
+    """
+    Bounded process pool for CPU-heavy rendering.
+
+    Work is submitted as a module-level function plus plain-data arguments,
+    so it can be pickled to a worker process. Rendering there keeps
+    ReportLab off the API process's GIL. With zero workers, jobs run inline.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        # Metrics
+        self.queue_depth = 0  # Jobs submitted and not yet finished
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.render_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # Spawn instead of fork: forking a threaded server process is unsafe
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.executor
+
+    def _job_finished(self, _future=None):
+        with self.lock:
+            self.queue_depth -= 1
+
+    def _submit(self, func: Callable, args: tuple):
+        try:
+            return self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool and retry once
+            self.reset()
+            return self._get_executor().submit(func, *args)
+
+    def _execute(self, func: Callable, args: tuple):
+        if self.workers <= 0:
+            try:
+                return func(*args)
+            finally:
+                self._job_finished()
+
+        try:
+            future = self._submit(func, args)
+        except Exception:
+            self._job_finished()
+            raise
+
+        # The slot is released when the job really ends, even after a timeout
+        future.add_done_callback(self._job_finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self.lock:
+                self.timeouts += 1
+            raise RenderTimeout(f"Render did not finish within {self.timeout:.0f}s")
+        except BrokenProcessPool:
+            self.reset()
+            raise
+
+    def run(self, func: Callable, *args):
+        """
+        Run func(*args) in the pool and wait for the result.
+
+        Meant to be called from a worker thread (sync endpoints), never from
+        the event loop.
+
+        Raises:
+            RenderQueueFull: queue_limit jobs are already waiting or running
+            RenderTimeout: the job did not finish within the timeout
+        """
+        with self.lock:
+            if self.queue_depth >= self.queue_limit:
+                self.rejected += 1
+                raise RenderQueueFull(f"Render queue is full ({self.queue_depth} jobs)")
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            self.submitted += 1
+
+        start = time.perf_counter()
+        try:
+            result = self._execute(func, args)
+        except (RenderTimeout, RenderQueueFull):
+            raise
+        except Exception:
+            with self.lock:
+                self.failed += 1
+            raise
+
+        with self.lock:
+            self.completed += 1
+            self.render_seconds += time.perf_counter() - start
+        return result
+
+    def stats(self) -> dict:
+        """Snapshot of the pool metrics"""
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "timeout_seconds": self.timeout,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_render_ms": round(self.render_seconds / self.completed * 1000, 2) if self.completed else 0,
+            }
+
+    def warm_up(self):
+        """Start the worker processes now rather than on the first render"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_worker_ready)
+
+    def reset(self):
+        """Discard the current executor, e.g. after a worker crashed"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _worker_ready() -> int:
+    # Import ReportLab and build the receipt styles before the first bill arrives
+    get_bill_styles()
+    get_table_styles()
+    return os.getpid()
+
+
+# Global bill render pool
+bill_render_pool = RenderPool(RENDER_WORKERS, RENDER_QUEUE_LIMIT, RENDER_TIMEOUT)
+
+
+def render_bill_pdf_pooled(bill: dict) -> bytes:
+    """Render a bill PDF in the process pool, reusing cached PDFs of paid bills"""
+    pdf = get_cached_bill_pdf(bill)
+    if pdf is None:
+        start = time.perf_counter()
+        pdf = bill_render_pool.run(render_bill_pdf, bill)
+        PDF_RENDER_SECONDS.observe(time.perf_counter() - start)
+        cache_bill_pdf(bill, pdf)
+    return pdf
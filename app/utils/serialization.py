@@ -0,0 +1,80 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Query
+from starlette.responses import Response
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter for List[model], built once per model and reused across requests"""
+    return TypeAdapter(List[model])
+
+
+def dump_models_json(model: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """
+    Validate ORM rows (or dicts) as List[model] and serialize them to JSON bytes.
+
+    Both steps run inside pydantic-core, without building intermediate dicts
+    in Python or going through json.dumps, which is what FastAPI's
+    response_model path does per request.
+    """
+    adapter = list_adapter(model)
+    rows = list(rows)
+    # Attribute lookup is only needed for ORM objects and costs extra on dicts
+    from_attributes = bool(rows) and not isinstance(rows[0], dict)
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=from_attributes))
+
+
+@lru_cache(maxsize=None)
+def model_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def dump_model_json(model: Type[BaseModel], value: Any) -> bytes:
+    """Validate a single document (dict or object) as model and serialize it to JSON bytes"""
+    adapter = model_adapter(model)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=not isinstance(value, dict)))
+
+
+@lru_cache(maxsize=None)
+def model_columns(entity, model: Type[BaseModel]) -> Tuple:
+    """The table columns of an ORM entity that a response model declares"""
+    table_columns = entity.__table__.c
+    return tuple(table_columns[name] for name in model.model_fields if name in table_columns)
+
+
+def column_rows(query: Query, entity, model: Type[BaseModel]) -> list:
+    """
+    Run an ORM query as plain column rows for a flat response model.
+
+    Skips building ORM objects (and their attribute instrumentation) when the
+    rows are only going to be serialized. Returns one dict per row.
+    """
+    columns = model_columns(entity, model)
+    names = [column.name for column in columns]
+    return [dict(zip(names, row)) for row in query.with_entities(*columns)]
+
+
+class ModelListResponse(Response):
+    """
+    JSON response for a list of rows serialized through the fast path.
+
+    Opt-in per endpoint: return ModelListResponse(Model, rows) instead of the
+    rows themselves. Keep response_model on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, model: Type[BaseModel], rows: Iterable[Any], status_code: int = 200, headers=None):
+        super().__init__(content=dump_models_json(model, rows), status_code=status_code, headers=headers)
+
+
+class ModelResponse(Response):
+    """JSON response for a single document serialized through the fast path"""
+
+    media_type = "application/json"
+
+    def __init__(self, model: Type[BaseModel], value: Any, status_code: int = 200, headers=None):
+        super().__init__(content=dump_model_json(model, value), status_code=status_code, headers=headers)
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Which store maps session ids to tenants: "memory" (this process only) or
+# "sqlite" (a file shared by every worker on the machine)
+SESSION_STORE = os.getenv("TABBLE_SESSION_STORE", "memory")
+SESSION_STORE_PATH = os.getenv("TABBLE_SESSION_STORE_PATH", "sessions.db")
+
+# Sessions unused for this long are forgotten; every use extends them
+SESSION_TTL = float(os.getenv("TABBLE_SESSION_TTL", str(7 * 24 * 3600)))
+
+# Expired sessions are swept at most this often, in seconds
+PURGE_INTERVAL = 60
+
+
+class SessionStore(ABC):
+    """
+    Maps session ids to the tenant database they selected.
+
+    Expiry slides: a session's deadline is pushed back to a full TTL when a
+    lookup finds it past half of its TTL, so busy sessions cost one write
+    per half TTL rather than one per request.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self.last_purge = 0.0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[str]:
+        """The session's database, or None when unknown or expired"""
+
+    @abstractmethod
+    def set(self, session_id: str, database_name: str):
+        """Point the session at a database, with a full TTL"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget the session"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of live sessions"""
+
+    def _purge_due(self, now: float) -> bool:
+        if now - self.last_purge < PURGE_INTERVAL:
+            return False
+        self.last_purge = now
+        return True
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in a dict of this process; fine for a single worker"""
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        super().__init__(ttl)
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[str, float]] = {}  # session id -> (database name, expires at)
+
+    def get(self, session_id: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(session_id)
+            if entry is None:
+                return None
+            database_name, expires_at = entry
+            if expires_at <= now:
+                del self.entries[session_id]
+                return None
+            if expires_at - now < self.ttl / 2:
+                self.entries[session_id] = (database_name, now + self.ttl)
+            return database_name
+
+    def set(self, session_id: str, database_name: str):
+        now = time.time()
+        with self.lock:
+            self.entries[session_id] = (database_name, now + self.ttl)
+            if self._purge_due(now):
+                for expired in [key for key, (_, expires_at) in self.entries.items() if expires_at <= now]:
+                    del self.entries[expired]
+
+    def delete(self, session_id: str):
+        with self.lock:
+            self.entries.pop(session_id, None)
+
+    def count(self) -> int:
+        now = time.time()
+        with self.lock:
+            return sum(1 for _, expires_at in self.entries.values() if expires_at > now)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file shared by all worker processes.
+
+    WAL mode lets every worker read concurrently while one writes; a lookup
+    is a primary key read on a connection kept per thread.
+    """
+
+    def __init__(self, path: str = SESSION_STORE_PATH, ttl: float = SESSION_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self.local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, database_name TEXT NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # Autocommit; every statement is its own short transaction
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, session_id: str) -> Optional[str]:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT database_name, expires_at FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, now),
+        ).fetchone()
+        if row is None:
+            return None
+        database_name, expires_at = row
+        if expires_at - now < self.ttl / 2:
+            connection.execute("UPDATE sessions SET expires_at = ? WHERE session_id = ?", (now + self.ttl, session_id))
+        return database_name
+
+    def set(self, session_id: str, database_name: str):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT INTO sessions (session_id, database_name, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET database_name = excluded.database_name, "
+            "expires_at = excluded.expires_at",
+            (session_id, database_name, now + self.ttl),
+        )
+        if self._purge_due(now):
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id: str):
+        self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def count(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+def create_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    """The session store selected by TABBLE_SESSION_STORE"""
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown TABBLE_SESSION_STORE {backend!r}, expected 'memory' or 'sqlite'")
@@ -0,0 +1,83 @@
+import os
+import re
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .compression import accepted_encodings
+
+# Names that change whenever the content does. Only these exact layouts count,
+# so a date or hex word in an ordinary name ("menu-20240101.png") does not:
+# our sha256-named uploads and their variants ("<64 hex>.jpg",
+# "<64 hex>_thumbnail.webp") ...
+HASHED_UPLOAD = re.compile(r"^[0-9a-f]{64}(?:_[a-z0-9_]+)?\.[A-Za-z0-9]+$")
+# ... and React build output, which is hashed only under static/js, static/css
+# and static/media ("main.3f2a9c1b.js", "787.1a2b3c4d.chunk.css")
+HASHED_BUILD_ASSET = re.compile(
+    r"[/\\]static[/\\](?:js|css|media)[/\\][^/\\]+\.[0-9a-f]{8,32}(?:\.chunk)?\.[A-Za-z0-9]+$"
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HTML_CACHE_CONTROL = "no-cache"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Precompressed siblings, in order of preference
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def cache_control_for(path: str) -> str:
+    """Pick the Cache-Control header for a static file by its name"""
+    name = os.path.basename(path)
+    if name.endswith(".html"):
+        return HTML_CACHE_CONTROL
+    if HASHED_UPLOAD.match(name) or HASHED_BUILD_ASSET.search(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return DEFAULT_CACHE_CONTROL
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with long-lived caching and precompressed variants.
+
+    Content-hashed names are served as immutable for a year, HTML is always
+    revalidated, everything else is cached for an hour. When the client
+    accepts it and a "<file>.br" or "<file>.gz" sibling exists (see
+    precompress_static.py), that file is sent instead of compressing on the fly.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        method = scope["method"]
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+
+        headers = {"Cache-Control": cache_control_for(full_path)}
+        media_type = guess_type(full_path)[0] or "text/plain"
+        served_path, served_stat = full_path, stat_result
+
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            try:
+                sibling_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # Any sibling means the response depends on Accept-Encoding
+            headers["Vary"] = "Accept-Encoding"
+            if encoding in accepted and sibling_stat.st_mtime >= stat_result.st_mtime:
+                served_path, served_stat = full_path + suffix, sibling_stat
+                headers["Content-Encoding"] = encoding
+                break
+
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=served_stat,
+            method=method,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
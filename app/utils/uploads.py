@@ -0,0 +1,110 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Upload limits, overridable through the environment
+UPLOAD_MAX_BYTES = int(os.getenv("TABBLE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Image types accepted for dish photos and logos
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+STATIC_ROOT = "app/static"
+
+
+@dataclass
+class StoredUpload:
+    path: str  # File system path of the stored file
+    url: str  # URL path the file is served under
+    sha256: str
+    size: int
+    created: bool  # False when an identical file was already stored
+
+
+def _image_extension(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image type. Use one of: {', '.join(sorted(IMAGE_EXTENSIONS))}"
+        )
+    return extension
+
+
+def _open_temp_file(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), temp_path
+
+
+def _write_chunk(buffer, hasher, chunk: bytes):
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _commit_temp_file(temp_path: str, final_path: str) -> bool:
+    # Same content, same name: keep the stored copy and drop the new one
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+        return False
+    os.replace(temp_path, final_path)
+    return True
+
+
+def _discard_temp_file(buffer, temp_path: str):
+    buffer.close()
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+async def save_image_upload(upload: UploadFile, subdirectory: str, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredUpload:
+    """
+    Store an uploaded image under app/static/{subdirectory}, named by its hash.
+
+    The upload is copied in chunks to a temp file in the target directory,
+    with all file I/O and hashing in the thread pool so the event loop stays
+    free, then atomically renamed to {sha256}{ext}. Identical images are
+    therefore stored once, and a file under its final name is always complete.
+
+    Raises:
+        HTTPException: 400 for a non-image extension, 413 above max_bytes
+    """
+    extension = _image_extension(upload.filename)
+    directory = os.path.join(STATIC_ROOT, subdirectory)
+
+    buffer, temp_path = await run_in_threadpool(_open_temp_file, directory)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds the limit of {max_bytes} bytes"
+                )
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        await run_in_threadpool(_discard_temp_file, buffer, temp_path)
+        raise
+
+    digest = hasher.hexdigest()
+    filename = f"{digest}{extension}"
+    final_path = os.path.join(directory, filename)
+    created = await run_in_threadpool(_commit_temp_file, temp_path, final_path)
+
+    return StoredUpload(
+        path=final_path,
+        url=f"/static/{subdirectory}/{filename}",
+        sha256=digest,
+        size=size,
+        created=created,
+    )
@@ -0,0 +1,45 @@
+import csv
+import os
+import sys
+
+from sqlalchemy import create_engine
+
+from app.database import Base, upgrade_schema, backfill_order_totals
+
+
+def get_database_names():
+    """Read all hotel databases from hotels.csv"""
+    with open("hotels.csv", "r") as file:
+        reader = csv.DictReader(file)
+        return [row["hotel_database"] for row in reader]
+
+
+def backfill_database(database_name):
+    """Add the order total columns if missing and recompute all order totals"""
+    if not os.path.exists(database_name):
+        print(f"Skipping {database_name}: file not found")
+        return
+
+    engine = create_engine(f"sqlite:///./{database_name}", connect_args={"check_same_thread": False})
+    try:
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+
+        with engine.begin() as connection:
+            updated_orders = backfill_order_totals(connection)
+
+        print(f"{database_name}: recomputed totals for {updated_orders} orders")
+    finally:
+        engine.dispose()
+
+
+def main():
+    # Backfill the databases given on the command line, or every hotel in hotels.csv
+    database_names = sys.argv[1:] or get_database_names()
+
+    for database_name in database_names:
+        backfill_database(database_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Bill rendering benchmark.
+
+Measures how many bills per second each renderer produces: the ReportLab
+PDF (fresh, and reprinted from the paid-bill cache) and the fixed-width
+text and ESC/POS receipt renderers.
+
+Usage:
+    python -m benchmarks.bench_bills [--bills 200] [--orders 3] [--items 6]
+"""
+import argparse
+import time
+
+from app.utils.pdf_generator import build_bill, render_bill_pdf, render_bill_pdf_cached
+from app.utils.receipt_renderer import render_bill_text, render_bill_escpos
+
+
+def make_orders(bill_number: int, orders_per_bill: int, items_per_order: int, status: str = "paid"):
+    """Build synthetic order snapshots for one bill"""
+    orders = []
+    for order_index in range(orders_per_bill):
+        orders.append({
+            "id": bill_number * 100 + order_index,
+            "table_number": bill_number % 30 + 1,
+            "status": status,
+            "person_name": f"Guest {bill_number}",
+            "items": [
+                {"name": f"Dish {item_index}", "quantity": item_index % 3 + 1, "unit_price": 4.5 + item_index}
+                for item_index in range(items_per_order)
+            ],
+        })
+    return orders
+
+
+SETTINGS = {
+    "hotel_name": "Tabble Hotel",
+    "address": "123 Main Street, City",
+    "contact_number": "+1 123-456-7890",
+    "tax_id": "22AAAAA0000A1Z5",
+}
+
+
+def run(label: str, render, bills):
+    """Render every bill once and print the throughput"""
+    start = time.perf_counter()
+    total_bytes = 0
+    for bill in bills:
+        total_bytes += len(render(bill))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(bills) / elapsed:>10.1f} bills/s  "
+          f"{elapsed / len(bills) * 1000:>8.2f} ms/bill  {total_bytes / len(bills) / 1024:>7.1f} KiB/bill")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bill rendering")
+    parser.add_argument("--bills", type=int, default=200, help="number of bills to render")
+    parser.add_argument("--orders", type=int, default=3, help="orders merged into each bill")
+    parser.add_argument("--items", type=int, default=6, help="items per order")
+    args = parser.parse_args()
+
+    bills = [build_bill(make_orders(n, args.orders, args.items), SETTINGS) for n in range(args.bills)]
+
+    # Warm up imports and the style sheet so they are not part of the measurement
+    render_bill_pdf(bills[0])
+
+    run("pdf (uncached)", render_bill_pdf, bills)
+    run("pdf (first print, cached)", render_bill_pdf_cached, bills)
+    run("pdf (paid reprint)", render_bill_pdf_cached, bills)
+    run("text", lambda bill: render_bill_text(bill).encode(), bills)
+    run("escpos", render_bill_escpos, bills)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Response serialization benchmark.
+
+Compares FastAPI's response_model path (validate, dump to Python objects,
+json.dumps) with the TypeAdapter fast path in app.utils.serialization, for
+a dish list (menu) and an order list with nested items and dishes. Each
+measurement includes loading the rows from an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_serialization [--dishes 500] [--orders 300] [--items 4] [--repeat 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, selectinload, joinedload
+
+from app.database import Base, Dish, Order, OrderItem
+from app.models.dish import Dish as DishModel
+from app.models.order import Order as OrderModel
+from app.services.order_rows import load_order_rows
+from app.utils.serialization import column_rows, dump_models_json
+
+
+def create_database(dish_count: int, order_count: int, items_per_order: int) -> Session:
+    """Fill an in-memory database with a large menu and order list"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    now = datetime.now(timezone.utc)
+
+    dishes = [
+        Dish(
+            name=f"Dish {index}",
+            description="Slow-cooked with seasonal vegetables and house spices",
+            category=f"Category {index % 12}",
+            price=4.5 + index % 20,
+            quantity=20,
+            image_path=f"/static/images/dishes/hotel.db/{index:064x}.jpg",
+            is_offer=int(index % 7 == 0),
+            is_special=int(index % 11 == 0),
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(dish_count)
+    ]
+    db.add_all(dishes)
+    db.flush()
+
+    for index in range(order_count):
+        order = Order(table_number=index % 30 + 1, unique_id=f"table-{index % 30}", status="pending",
+                      created_at=now, updated_at=now)
+        for item_index in range(items_per_order):
+            dish = dishes[(index + item_index) % len(dishes)]
+            order.items.append(OrderItem(dish_id=dish.id, quantity=item_index % 3 + 1,
+                                         unit_price=dish.price, created_at=now))
+        db.add(order)
+    db.commit()
+    return db
+
+
+def fastapi_serialize(model, rows) -> bytes:
+    """What FastAPI does for a route declared with response_model=List[model]"""
+    field = create_response_field(name="response", type_=List[model], mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=False))
+    return JSONResponse(content).body
+
+
+def check_same_output(expected: bytes, actual: bytes):
+    """The fast path must produce the same JSON as the response_model path"""
+    if json.loads(expected) != json.loads(actual):
+        raise SystemExit("Fast path output differs from the response_model output")
+
+
+def run(label: str, respond, repeat: int):
+    """Call respond() repeat times and print the per-call time"""
+    respond()  # Warm up adapters and caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(respond())
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<40} {elapsed * 1000:>9.2f} ms/call  {size / 1024:>8.1f} KiB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--dishes", type=int, default=500, help="dishes in the menu list")
+    parser.add_argument("--orders", type=int, default=300, help="orders in the order list")
+    parser.add_argument("--items", type=int, default=4, help="items per order")
+    parser.add_argument("--repeat", type=int, default=20, help="calls per measurement")
+    args = parser.parse_args()
+
+    db = create_database(args.dishes, args.orders, args.items)
+
+    def dish_query():
+        db.expunge_all()  # Load fresh rows every call, as a request would
+        return db.query(Dish).filter(Dish.visibility == 1)
+
+    def order_query():
+        db.expunge_all()
+        return db.query(Order).options(selectinload(Order.items).joinedload(OrderItem.dish))
+
+    def menu_slow():
+        return fastapi_serialize(DishModel, dish_query().all())
+
+    def menu_fast():
+        return dump_models_json(DishModel, column_rows(dish_query(), Dish, DishModel))
+
+    def orders_slow():
+        return fastapi_serialize(OrderModel, order_query().all())
+
+    def orders_fast():
+        return dump_models_json(OrderModel, load_order_rows(db, db.query(Order)))
+
+    check_same_output(menu_slow(), menu_fast())
+    check_same_output(orders_slow(), orders_fast())
+
+    print(f"{args.dishes} dishes")
+    slow = run("ORM rows + response_model", menu_slow, args.repeat)
+    run("ORM rows + TypeAdapter", lambda: dump_models_json(DishModel, dish_query().all()), args.repeat)
+    fast = run("column rows + TypeAdapter", menu_fast, args.repeat)
+    print(f"  speedup {slow / fast:.1f}x")
+
+    print(f"{args.orders} orders x {args.items} items")
+    slow = run("ORM rows + response_model", orders_slow, args.repeat)
+    run("ORM rows + TypeAdapter", lambda: dump_models_json(OrderModel, order_query().all()), args.repeat)
+    fast = run("column rows + TypeAdapter", orders_fast, args.repeat)
+    print(f"  speedup {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
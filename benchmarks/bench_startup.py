@@ -0,0 +1,160 @@
+"""
+Startup benchmark.
+
+Measures what a fresh worker pays before it serves traffic:
+
+- import time of app.main, from `python -X importtime`, with the top
+  packages and modules by self time, so a heavy import that slips back
+  into the startup path shows up by name
+- cold start of a uvicorn server on temporary tenants: time until it
+  answers its first request, then the latency of each hotel's first visit
+  (switching to the hotel and loading its menu, which pays the engine,
+  schema check and cache fill unless the server warmed them up) against a
+  repeat menu request
+
+Every measurement runs in a new interpreter; the median of --runs is
+reported.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15] [--hotels 3] [--warm-up]
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.load_test import REPO_ROOT, free_port, prepare_workdir
+
+
+def import_times() -> dict:
+    """Self and cumulative import time in seconds per module, from one fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return modules
+
+
+def report_imports(runs: int, top: int):
+    samples = [import_times() for _ in range(runs)]
+    totals = [modules["app.main"][1] for modules in samples]
+    median_run = samples[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"import app.main: {statistics.median(totals) * 1000:.0f} ms median "
+          f"(min {min(totals) * 1000:.0f}, max {max(totals) * 1000:.0f}, {runs} runs)\n")
+
+    packages = defaultdict(float)
+    for name, (self_time, _) in median_run.items():
+        packages[name.split(".")[0]] += self_time
+    total = sum(packages.values())
+    print(f"{'package':<28} {'self ms':>9} {'share':>7}")
+    for package, self_time in sorted(packages.items(), key=lambda entry: -entry[1])[:top]:
+        print(f"{package:<28} {self_time * 1000:>9.1f} {self_time / total:>7.1%}")
+
+    print(f"\n{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    for name, (self_time, cumulative) in sorted(median_run.items(), key=lambda entry: -entry[1][0])[:top]:
+        print(f"{name:<48} {self_time * 1000:>9.1f} {cumulative * 1000:>14.1f}")
+
+
+def timed_request(port: int, method: str, path: str, headers: dict = None, json_body=None) -> float:
+    """Seconds for one request on a new connection, or raises on a non-200 answer"""
+    headers = dict(headers or {})
+    body = None
+    if json_body is not None:
+        body = json.dumps(json_body)
+        headers["Content-Type"] = "application/json"
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path} answered {response.status}")
+    finally:
+        connection.close()
+    return time.perf_counter() - start
+
+
+def cold_start(workdir: str, hotels: int, warm_up: bool) -> dict:
+    """Start a server and time its first response, then each hotel's first and repeat visit"""
+    env = dict(os.environ, TABBLE_REQUEST_LOG="0", TABBLE_WARM_UP="1" if warm_up else "0")
+    for name in os.listdir(workdir):
+        if name.startswith("sessions.db"):
+            os.remove(os.path.join(workdir, name))
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit("uvicorn exited during startup")
+            if time.perf_counter() - start > 60:
+                raise SystemExit("uvicorn did not start within 60 seconds")
+            try:
+                timed_request(port, "GET", "/settings/databases")
+                break
+            except (OSError, RuntimeError):
+                time.sleep(0.02)
+        result = {"first_response": time.perf_counter() - start, "first_visit": [], "repeat_menu": []}
+
+        for index in range(hotels):
+            database, password = f"loadtest_{index}.db", f"password{index}"
+            headers = {"x-session-id": f"bench-{index}", "x-database-name": database, "x-database-password": password}
+            result["first_visit"].append(
+                timed_request(port, "POST", "/settings/switch-database", headers,
+                              {"database_name": database, "password": password})
+                + timed_request(port, "GET", "/customer/api/menu", headers))
+            result["repeat_menu"].append(timed_request(port, "GET", "/customer/api/menu", headers))
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report_cold_start(runs: int, hotels: int, warm_up: bool):
+    workdir = prepare_workdir(hotels, tables=10, dishes=60)
+    try:
+        results = [cold_start(workdir, hotels, warm_up) for _ in range(runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    def median_ms(values):
+        return statistics.median(values) * 1000
+
+    print(f"\ncold start ({hotels} hotels, warm-up {'on' if warm_up else 'off'}, {runs} runs)")
+    print(f"  process start to first response       {median_ms([r['first_response'] for r in results]):>8.0f} ms")
+    print(f"  first visit per hotel (switch + menu) {median_ms([t for r in results for t in r['first_visit']]):>8.1f} ms")
+    print(f"  repeat menu request per hotel         {median_ms([t for r in results for t in r['repeat_menu']]):>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker startup")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters / servers per measurement")
+    parser.add_argument("--top", type=int, default=15, help="packages and modules listed")
+    parser.add_argument("--hotels", type=int, default=3, help="tenants for the cold start test")
+    parser.add_argument("--warm-up", action="store_true", help="start the server with TABBLE_WARM_UP=1")
+    args = parser.parse_args()
+
+    report_imports(args.runs, args.top)
+    report_cold_start(args.runs, args.hotels, args.warm_up)
+
+
+if __name__ == "__main__":
+    main()
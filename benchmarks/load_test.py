@@ -0,0 +1,343 @@
+"""
+Load test with restaurant traffic profiles.
+
+Starts uvicorn on temporary SQLite tenants (N hotels, each with M tables and
+a seeded menu) and drives it with simulated users for a fixed duration:
+
+- diners (one per table): browse the menu, place an order, poll its status
+  until the kitchen completes it, then pay
+- chefs (per hotel): poll the pending and accepted queues, accept and
+  complete orders
+- admins (per hotel): open the analytics dashboard, list orders and print
+  bills for paid orders
+
+Reports request count, throughput, error rate and p50/p95/p99 latency per
+endpoint. Every user is a thread with its own keep-alive connection, so the
+generator needs no third-party HTTP client.
+
+Usage:
+    python -m benchmarks.load_test [--hotels 2] [--tables 10] [--dishes 60] [--duration 30]
+                                   [--chefs 1] [--admins 1] [--think 1.0] [--json results.json]
+"""
+import argparse
+import csv
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base, Dish, LoyaltyProgram, SelectionOffer, Settings, Table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATEGORIES = ["Starters", "Soups", "Mains", "Breads", "Rice", "Desserts", "Beverages"]
+
+
+def seed_hotel(path: str, tables: int, dishes: int):
+    """Create a tenant database with a menu, tables and discount rules"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as db:
+        db.add(Settings(hotel_name=os.path.basename(path), address="1 Load Test Road",
+                        contact_number="+1 000-000-0000", email="load@test.local"))
+        db.add_all(
+            Dish(
+                name=f"Dish {index}",
+                description="Prepared fresh with house spices",
+                category=CATEGORIES[index % len(CATEGORIES)],
+                price=round(3.5 + (index * 7) % 25, 2),
+                quantity=100000,
+                is_offer=int(index % 9 == 0),
+                is_special=int(index % 13 == 0),
+                created_at=now,
+                updated_at=now,
+            )
+            for index in range(dishes)
+        )
+        db.add_all(Table(table_number=number, created_at=now, updated_at=now) for number in range(1, tables + 1))
+        db.add(LoyaltyProgram(visit_count=3, discount_percentage=5, created_at=now, updated_at=now))
+        db.add(SelectionOffer(min_amount=50, discount_amount=5, description="Spend 50, save 5",
+                              created_at=now, updated_at=now))
+        db.commit()
+    engine.dispose()
+
+
+def prepare_workdir(hotels: int, tables: int, dishes: int) -> str:
+    """Temporary server directory: seeded tenants, hotels.csv and links to the code"""
+    workdir = tempfile.mkdtemp(prefix="tabble-load-")
+    for name in ("app", "templates"):
+        os.symlink(os.path.join(REPO_ROOT, name), os.path.join(workdir, name))
+
+    with open(os.path.join(workdir, "hotels.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["hotel_database", "password"])
+        for index in range(hotels):
+            database = f"loadtest_{index}.db"
+            seed_hotel(os.path.join(workdir, database), tables, dishes)
+            writer.writerow([database, f"password{index}"])
+    return workdir
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int) -> subprocess.Popen:
+    """Run uvicorn from the work directory and wait until it answers"""
+    # A single worker: tenant selection is kept in process memory per session
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=workdir,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("uvicorn exited during startup")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/settings/databases")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn did not start within 60 seconds")
+
+
+class Stats:
+    """Latencies and errors per endpoint, shared by all users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label: str, elapsed: float, ok: bool):
+        with self.lock:
+            self.latencies[label].append(elapsed)
+            if not ok:
+                self.errors[label] += 1
+
+
+class Client:
+    """One simulated user: a keep-alive connection with its own tenant session"""
+
+    def __init__(self, port: int, stats: Stats, database: str, password: str):
+        self.port = port
+        self.stats = stats
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.headers = {
+            "x-session-id": f"load-{uuid.uuid4().hex}",
+            "x-database-name": database,
+            "x-database-password": password,
+            "Accept-Encoding": "gzip",
+        }
+        self.call("POST", "/settings/switch-database", "POST /settings/switch-database",
+                  json_body={"database_name": database, "password": password})
+
+    def call(self, method: str, path: str, label: str, params: dict = None, json_body=None, expect=(200,)):
+        """Send one request, record its latency under label and return the decoded body"""
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = dict(self.headers)
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers["Content-Type"] = "application/json"
+
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.stats.record(label, time.perf_counter() - start, False)
+            self.connection.close()
+            self.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            return None
+        self.stats.record(label, time.perf_counter() - start, response.status in expect)
+
+        if response.status not in expect:
+            return None
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(data)
+        return data
+
+
+def diner(client: Client, table_number: int, deadline: float, think: float):
+    """Browse, order, wait for the kitchen, pay; repeat until the deadline"""
+    rng = random.Random()
+    person = client.call("POST", "/customer/api/register", "POST /customer/api/register", json_body={
+        "username": f"guest-{uuid.uuid4().hex[:12]}",
+        "password": "secret",
+        "table_number": table_number,
+    })
+    if person is None:
+        return
+
+    while time.time() < deadline:
+        menu = client.call("GET", "/customer/api/menu", "GET /customer/api/menu")
+        client.call("GET", "/customer/api/categories", "GET /customer/api/categories")
+        client.call("GET", "/customer/api/menu", "GET /customer/api/menu?category",
+                    params={"category": rng.choice(CATEGORIES)})
+        if not menu:
+            time.sleep(think)
+            continue
+        time.sleep(rng.uniform(0.5, 1.5) * think)
+
+        items = [{"dish_id": dish["id"], "quantity": rng.randint(1, 3)}
+                 for dish in rng.sample(menu, min(len(menu), rng.randint(1, 4)))]
+        order = client.call("POST", "/customer/api/orders", "POST /customer/api/orders",
+                            params={"person_id": person["id"]},
+                            json_body={"table_number": table_number, "unique_id": f"table-{table_number}",
+                                       "items": items})
+        if order is None:
+            continue
+
+        # Poll like the menu page does until the order is ready to pay
+        while time.time() < deadline:
+            time.sleep(think)
+            status = client.call("GET", f"/customer/api/orders/{order['id']}", "GET /customer/api/orders/{id}")
+            client.call("GET", f"/customer/api/person/{person['id']}/orders",
+                        "GET /customer/api/person/{id}/orders")
+            if status and status["status"] == "completed":
+                client.call("PUT", f"/customer/api/orders/{order['id']}/payment",
+                            "PUT /customer/api/orders/{id}/payment")
+                break
+
+
+def chef(client: Client, deadline: float, think: float):
+    """Poll both queues, accept pending orders and complete accepted ones"""
+    while time.time() < deadline:
+        pending = client.call("GET", "/chef/orders/pending", "GET /chef/orders/pending") or []
+        accepted = client.call("GET", "/chef/orders/accepted", "GET /chef/orders/accepted") or []
+        for order in pending[:3]:
+            client.call("PUT", f"/chef/orders/{order['id']}/accept", "PUT /chef/orders/{id}/accept",
+                        expect=(200, 400))
+        for order in accepted[:3]:
+            client.call("PUT", f"/chef/orders/{order['id']}/complete", "PUT /chef/orders/{id}/complete",
+                        expect=(200, 400))
+        time.sleep(think)
+
+
+def admin(client: Client, deadline: float, think: float):
+    """Watch the dashboard and orders list, print bills for paid orders"""
+    rng = random.Random()
+    while time.time() < deadline:
+        client.call("GET", "/analytics/dashboard", "GET /analytics/dashboard")
+        client.call("GET", "/admin/orders", "GET /admin/orders")
+        paid = client.call("GET", "/admin/orders/completed-for-billing", "GET /admin/orders/completed-for-billing")
+        if paid:
+            order = rng.choice(paid)
+            client.call("GET", f"/admin/orders/{order['id']}/bill", "GET /admin/orders/{id}/bill")
+        time.sleep(think * 5)
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+def report(stats: Stats, elapsed: float) -> dict:
+    """Print the per-endpoint table and return it as a dict"""
+    results = {}
+    print(f"{'endpoint':<44} {'requests':>8} {'req/s':>8} {'errors':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label in sorted(stats.latencies):
+        values = sorted(stats.latencies[label])
+        row = {
+            "requests": len(values),
+            "throughput": len(values) / elapsed,
+            "error_rate": stats.errors[label] / len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+        results[label] = row
+        print(f"{label:<44} {row['requests']:>8} {row['throughput']:>8.1f} {row['error_rate']:>7.1%} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+
+    total = sum(len(values) for values in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"total {total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s, "
+          f"{errors / total if total else 0:.2%} errors")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a local server with restaurant traffic")
+    parser.add_argument("--hotels", type=int, default=2, help="tenant databases")
+    parser.add_argument("--tables", type=int, default=10, help="tables (one diner each) per hotel")
+    parser.add_argument("--dishes", type=int, default=60, help="menu size per hotel")
+    parser.add_argument("--chefs", type=int, default=1, help="chefs per hotel")
+    parser.add_argument("--admins", type=int, default=1, help="admins per hotel")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between a user's actions")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary server directory")
+    args = parser.parse_args()
+
+    workdir = prepare_workdir(args.hotels, args.tables, args.dishes)
+    port = free_port()
+    server = start_server(workdir, port)
+    stats = Stats()
+
+    try:
+        deadline = time.time() + args.duration
+        users = []
+        for index in range(args.hotels):
+            tenant = (f"loadtest_{index}.db", f"password{index}")
+            users += [threading.Thread(target=diner, args=(Client(port, stats, *tenant), number, deadline, args.think))
+                      for number in range(1, args.tables + 1)]
+            users += [threading.Thread(target=chef, args=(Client(port, stats, *tenant), deadline, args.think))
+                      for _ in range(args.chefs)]
+            users += [threading.Thread(target=admin, args=(Client(port, stats, *tenant), deadline, args.think))
+                      for _ in range(args.admins)]
+
+        print(f"{len(users)} users on {args.hotels} hotels for {args.duration:.0f}s")
+        start = time.time()
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        results = report(stats, time.time() - start)
+
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump({"arguments": vars(args), "endpoints": results}, file, indent=2)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if args.keep:
+            print(f"server directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
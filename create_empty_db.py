@@ -13,6 +13,8 @@ def create_database_schema():
                 price FLOAT,
                 quantity INTEGER,
                 image_path VARCHAR,
+                image_hash VARCHAR,
+                image_variants TEXT,
                 discount FLOAT,
                 is_offer INTEGER,
                 is_special INTEGER,
@@ -67,6 +69,7 @@ def create_database_schema():
                 email VARCHAR,
                 tax_id VARCHAR,
                 logo_path VARCHAR,
+                logo_hash VARCHAR,
                 created_at DATETIME,
                 updated_at DATETIME,
                 PRIMARY KEY (id)
@@ -79,6 +82,8 @@ def create_database_schema():
                 unique_id VARCHAR,
                 person_id INTEGER,
                 status VARCHAR,
+                total_amount FLOAT,
+                item_count INTEGER,
                 created_at DATETIME,
                 updated_at DATETIME,
                 PRIMARY KEY (id),
@@ -91,6 +96,7 @@ def create_database_schema():
                 order_id INTEGER,
                 dish_id INTEGER,
                 quantity INTEGER,
+                unit_price FLOAT,
                 remarks TEXT,
                 created_at DATETIME,
                 PRIMARY KEY (id),
@@ -111,6 +117,15 @@ def create_database_schema():
                 FOREIGN KEY(person_id) REFERENCES persons (id)
             )
         ''',
+        'order_events': '''
+            CREATE TABLE order_events (
+                id INTEGER NOT NULL,
+                order_id INTEGER NOT NULL,
+                status VARCHAR NOT NULL,
+                created_at DATETIME NOT NULL,
+                PRIMARY KEY (id)
+            )
+        ''',
         'tables': '''
             CREATE TABLE tables (
                 id INTEGER NOT NULL,
@@ -127,6 +142,17 @@ def create_database_schema():
     }
     return schema
 
+def create_index_schema():
+    """Define the secondary indexes created after the tables"""
+    return [
+        'CREATE INDEX ix_order_events_order_id_created_at ON order_events (order_id, created_at)',
+        'CREATE INDEX ix_order_events_created_at ON order_events (created_at)',
+        'CREATE INDEX ix_orders_created_at ON orders (created_at)',
+        'CREATE INDEX ix_orders_updated_at ON orders (updated_at)',
+        'CREATE INDEX ix_order_items_order_id ON order_items (order_id)',
+        'CREATE INDEX ix_tables_updated_at ON tables (updated_at)',
+    ]
+
 def create_empty_database(new_db_name):
     """Create new database with schema but no data"""
     if not new_db_name.endswith('.db'):
@@ -145,6 +171,9 @@ def create_empty_database(new_db_name):
         schema = create_database_schema()
         for table_name, create_statement in schema.items():
             new_cursor.execute(create_statement)
+
+        for index_statement in create_index_schema():
+            new_cursor.execute(index_statement)
             
         new_conn.commit()
         new_conn.close()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link as RouterLink, useNavigate } from 'react-router-dom';
 import {
   Container,
@@ -38,7 +38,7 @@ import ThumbUpIcon from '@mui/icons-material/ThumbUp';
 
 import RefreshIcon from '@mui/icons-material/Refresh';
 import TimerIcon from '@mui/icons-material/Timer';
-import { chefService, adminService } from '../../services/api';
+import { chefService, adminService, applyDelta } from '../../services/api';
 
 const ChefOrders = () => {
   const navigate = useNavigate();
@@ -58,19 +58,22 @@ const ChefOrders = () => {
   });
   const [refreshing, setRefreshing] = useState(false);
   const [databaseError, setDatabaseError] = useState(false);
+  // Sync cursors: after the first load only changed orders are fetched
+  const cursors = useRef({ pending: null, accepted: null });
 
   // Fetch all orders
   const fetchOrders = async () => {
     setLoading(true);
     try {
       // Fetch both pending and accepted orders
-      const [pendingOrdersData, acceptedOrdersData] = await Promise.all([
-        chefService.getPendingOrders(),
-        chefService.getAcceptedOrders()
+      const [pendingDelta, acceptedDelta] = await Promise.all([
+        chefService.syncPendingOrders(cursors.current.pending),
+        chefService.syncAcceptedOrders(cursors.current.accepted)
       ]);
 
-      setPendingOrders(pendingOrdersData);
-      setAcceptedOrders(acceptedOrdersData);
+      cursors.current = { pending: pendingDelta.cursor, accepted: acceptedDelta.cursor };
+      setPendingOrders(orders => applyDelta(orders, pendingDelta));
+      setAcceptedOrders(orders => applyDelta(orders, acceptedDelta));
       setLoading(false);
     } catch (error) {
       console.error('Error fetching orders:', error);
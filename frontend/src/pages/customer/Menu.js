@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import moment from 'moment-timezone';
 import {
@@ -74,6 +74,8 @@ const CustomerMenu = () => {
   const [loading, setLoading] = useState(true);
   const [loadingCategories, setLoadingCategories] = useState(true);
   const [currentOrder, setCurrentOrder] = useState(null);
+  // Read by the status long poll, which outlives individual renders
+  const currentOrderRef = useRef(null);
   const [unpaidOrders, setUnpaidOrders] = useState([]);
   const [openDialog, setOpenDialog] = useState(false);
   const [selectedDish, setSelectedDish] = useState(null);
@@ -216,22 +218,17 @@ const CustomerMenu = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        // Get categories
-        const categoriesData = await customerService.getCategories();
-        setCategories(['All', ...categoriesData]);
-        setLoadingCategories(false);
+        // Menu, categories, offers and specials arrive in a single payload
+        const bootstrap = await customerService.getBootstrap();
+        const dishesData = bootstrap.menu;
 
-        // Get menu items
-        const dishesData = await customerService.getMenu();
+        setCategories(['All', ...bootstrap.categories]);
+        setLoadingCategories(false);
 
-        // Get offer items
-        const offersData = await customerService.getOffers();
-        setOffers(offersData);
+        setOffers(bootstrap.offers);
         setLoadingOffers(false);
 
-        // Get special items
-        const specialsData = await customerService.getSpecials();
-        setSpecials(specialsData);
+        setSpecials(bootstrap.specials);
         setLoadingSpecials(false);
 
         // Add mock ratings and random prep times for visual enhancement
@@ -281,24 +278,52 @@ const CustomerMenu = () => {
     fetchCurrentOrder();
     fetchUserOrders();
 
-    // Set up polling every 10 seconds for real-time updates
-    const orderPollingInterval = setInterval(async () => {
-      setIsPollingActive(true);
-      try {
-        await fetchCurrentOrder();
-        await fetchUserOrders();
-      } catch (error) {
-        console.error('Error during polling:', error);
-      } finally {
-        setIsPollingActive(false);
+    // Long-poll the current order: the server answers as soon as its status
+    // changes. Without an open order, fall back to checking every 10 seconds.
+    let stopped = false;
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+    // Last status seen by the poll itself, which may be newer than currentOrder's
+    const seen = { id: null, status: null };
+
+    const pollOrderStatus = async () => {
+      while (!stopped) {
+        const order = currentOrderRef.current;
+        try {
+          if (order) {
+            const status = order.id === seen.id ? seen.status : order.status;
+            const latest = await customerService.waitForOrderStatus(order.id, status);
+            if (latest.status === status) continue; // Timed out without a change
+            seen.id = latest.id;
+            seen.status = latest.status;
+          } else {
+            await sleep(10000);
+          }
+          if (stopped) break;
+
+          setIsPollingActive(true);
+          await fetchCurrentOrder();
+          await fetchUserOrders();
+        } catch (error) {
+          console.error('Error during polling:', error);
+          await sleep(10000);
+        } finally {
+          setIsPollingActive(false);
+        }
       }
-    }, 10000); // 10 seconds
+    };
+
+    pollOrderStatus();
 
     return () => {
-      clearInterval(orderPollingInterval);
+      stopped = true;
     };
   }, [userId]);
 
+  useEffect(() => {
+    currentOrderRef.current = currentOrder;
+  }, [currentOrder]);
+
   // Mark table as occupied when component loads
   useEffect(() => {
     const markTableAsOccupied = async () => {
@@ -67,8 +67,9 @@ const MenuItemsGrid = ({
                   <Box sx={{ width: '55%', position: 'relative' }}>
                     <Box
                       component="img"
-                      src={dish.image_path ? `${process.env.REACT_APP_API_BASE_URL}${dish.image_path}` : 'https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D&auto=format&fit=crop&w=600&q=80'}
+                      src={dish.image_path ? `${process.env.REACT_APP_API_BASE_URL}${dish.image_variants?.medium_webp || dish.image_path}` : 'https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D&auto=format&fit=crop&w=600&q=80'}
                       alt={dish.name}
+                      loading="lazy"
                       sx={{
                         width: '100%',
                         height: '100%',
@@ -96,8 +96,47 @@ api.interceptors.response.use(
   }
 );
 
+// Fetch a list endpoint that supports delta sync. Without a cursor the full
+// list is returned; with one, only { changed, removed } since that cursor.
+const syncList = async (url, cursor = null) => {
+  const params = cursor ? { since: cursor } : {};
+  const response = await api.get(url, { params });
+  if (cursor) {
+    return { ...response.data, full: false };
+  }
+  return {
+    cursor: response.headers['x-sync-cursor'],
+    changed: response.data,
+    removed: [],
+    full: true,
+  };
+};
+
+// Apply a syncList() result to a list of rows with ids
+export const applyDelta = (rows, delta, compare = (a, b) => a.id - b.id) => {
+  if (delta.full) {
+    return delta.changed;
+  }
+  const changedIds = new Set(delta.changed.map(row => row.id));
+  const removedIds = new Set(delta.removed);
+  return rows
+    .filter(row => !changedIds.has(row.id) && !removedIds.has(row.id))
+    .concat(delta.changed)
+    .sort(compare);
+};
+
 // Customer API services
 export const customerService = {
+  // Get menu, categories, offers, specials, settings and active discounts in one call
+  getBootstrap: async () => {
+    try {
+      const response = await api.get('/customer/api/bootstrap');
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+
   // Get all menu items
   getMenu: async (category = null) => {
     try {
@@ -183,6 +222,18 @@ export const customerService = {
     }
   },
 
+  // Wait until an order's status differs from the given one (long poll, returns the order)
+  waitForOrderStatus: async (orderId, status, timeout = 25) => {
+    try {
+      const response = await api.get(`/customer/api/orders/${orderId}/wait`, {
+        params: { status, timeout },
+      });
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+
   // Cancel an order
   cancelOrder: async (orderId) => {
     try {
@@ -328,6 +379,24 @@ export const chefService = {
     }
   },
 
+  // Get pending orders changed since a cursor (the full list when cursor is null)
+  syncPendingOrders: async (cursor = null) => syncList('/chef/orders/pending', cursor),
+
+  // Get accepted orders changed since a cursor (the full list when cursor is null)
+  syncAcceptedOrders: async (cursor = null) => syncList('/chef/orders/accepted', cursor),
+
+  // Wait for the pending queue to change after a cursor (long poll, returns a delta)
+  waitForPendingOrders: async (cursor, timeout = 25) => {
+    const response = await api.get('/chef/orders/pending/wait', { params: { since: cursor, timeout } });
+    return { ...response.data, full: false };
+  },
+
+  // Wait for the accepted queue to change after a cursor (long poll, returns a delta)
+  waitForAcceptedOrders: async (cursor, timeout = 25) => {
+    const response = await api.get('/chef/orders/accepted/wait', { params: { since: cursor, timeout } });
+    return { ...response.data, full: false };
+  },
+
   // Accept an order
   acceptOrder: async (orderId) => {
     try {
@@ -426,10 +495,11 @@ export const adminService = {
     }
   },
 
-  // Generate bill PDF for a single order
-  generateBill: async (orderId) => {
+  // Generate bill for a single order (format: 'pdf', 'text' or 'escpos')
+  generateBill: async (orderId, format = 'pdf') => {
     try {
       const response = await api.get(`/admin/orders/${orderId}/bill`, {
+        params: { format },
         responseType: 'blob',
       });
       return response.data;
@@ -439,10 +509,11 @@ export const adminService = {
     }
   },
 
-  // Generate bill PDF for multiple orders
-  generateMultiBill: async (orderIds) => {
+  // Generate bill for multiple orders (format: 'pdf', 'text' or 'escpos')
+  generateMultiBill: async (orderIds, format = 'pdf') => {
     try {
       const response = await api.post(`/admin/orders/multi-bill`, orderIds, {
+        params: { format },
         responseType: 'blob',
       });
       return response.data;
@@ -0,0 +1,60 @@
+import csv
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base, Dish, upgrade_schema
+from app.utils.image_variants import generate_image_variants
+
+
+def get_database_names():
+    """Read all hotel databases from hotels.csv"""
+    with open("hotels.csv", "r") as file:
+        reader = csv.DictReader(file)
+        return [row["hotel_database"] for row in reader]
+
+
+def generate_for_database(database_name):
+    """Create thumbnails and WebP copies for every dish image that has none yet"""
+    if not os.path.exists(database_name):
+        print(f"Skipping {database_name}: file not found")
+        return
+
+    engine = create_engine(f"sqlite:///./{database_name}", connect_args={"check_same_thread": False})
+    db = Session(bind=engine)
+    try:
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+
+        dishes = db.query(Dish).filter(Dish.image_path.isnot(None), Dish.image_variants.is_(None)).all()
+        updated = 0
+        for dish in dishes:
+            try:
+                variants = generate_image_variants(dish.image_path)
+            except Exception as e:
+                print(f"{database_name}: could not process {dish.image_path}: {e}")
+                continue
+            if variants:
+                dish.image_variants = json.dumps(variants)
+                updated += 1
+
+        db.commit()
+        print(f"{database_name}: generated image variants for {updated} of {len(dishes)} dishes")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main():
+    # Process the databases given on the command line, or every hotel in hotels.csv
+    database_names = sys.argv[1:] or get_database_names()
+
+    for database_name in database_names:
+        generate_for_database(database_name)
+
+
+if __name__ == "__main__":
+    main()
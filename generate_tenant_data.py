@@ -0,0 +1,274 @@
+"""
+Fill a tenant database with synthetic data at production scale.
+
+Generates dishes, tables, persons, orders with items, order events and
+feedback with realistic shapes: orders cluster around lunch and dinner and
+on weekends, a few dishes account for most items, regulars visit far more
+often than one-off guests and ratings lean positive. Rows are written with
+executemany in large batches on a single connection with the secondary
+indexes dropped and rebuilt at the end, at roughly 20,000 orders (with
+their items and events) per second. Data is appended to whatever the
+database already holds.
+
+Usage:
+    python generate_tenant_data.py DATABASE [--dishes 2000] [--orders 200000] [--persons 50000]
+                                            [--feedback 20000] [--tables 40] [--days 365] [--seed 1]
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+
+from app.database import Base, upgrade_schema
+
+BATCH_SIZE = 50000
+
+CATEGORIES = ["Starters", "Soups", "Salads", "Main Course", "Breads", "Rice", "Desserts", "Beverages"]
+
+# Relative order volume per hour of day: lunch and dinner peaks, quiet mornings
+HOUR_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 3, 6,  # 00-11
+    14, 16, 9, 4, 3, 4, 8, 15, 18, 14, 7, 2,  # 12-23
+]
+
+# Relative order volume per weekday, Monday first
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.3, 1.6, 1.4]
+
+# Minutes an order spends in each status before moving to the next
+STATUS_MINUTES = {"pending": (1, 6), "accepted": (8, 30), "completed": (5, 45)}
+
+COMMENTS = [
+    "Great food and quick service", "Loved the desserts", "A bit too spicy for me",
+    "Will come back again", "Portions could be bigger", "Friendly staff", None, None, None,
+]
+
+
+def timestamp(value: datetime) -> str:
+    # The format SQLAlchemy uses for DateTime columns on SQLite
+    return value.isoformat(" ", "microseconds")
+
+
+def next_id(cursor, table: str) -> int:
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def insert(cursor, table: str, columns: list, rows):
+    """executemany in batches of BATCH_SIZE; returns the number of rows"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch:
+            return total
+        cursor.executemany(sql, batch)
+        total += len(batch)
+
+
+def drop_indexes(cursor, tables: list) -> list:
+    """Drop the secondary indexes of tables and return their CREATE statements"""
+    placeholders = ", ".join("?" * len(tables))
+    cursor.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders})", tables)
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+    return [sql for _, sql in indexes]
+
+
+def zipf_cumulative(count: int, exponent: float = 1.1) -> list:
+    """Cumulative weights where rank r is picked proportionally to 1 / r**exponent"""
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def order_times(rng: random.Random, count: int, days: int, end: datetime) -> list:
+    """count order timestamps over the last days days, following the hour and weekday weights, sorted"""
+    start_day = (end - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    day_weights = [WEEKDAY_WEIGHTS[(start_day + timedelta(days=day)).weekday()] for day in range(days)]
+    day_picks = rng.choices(range(days), weights=day_weights, k=count)
+    hour_picks = rng.choices(range(24), weights=HOUR_WEIGHTS, k=count)
+    times = [
+        start_day + timedelta(days=day, hours=hour, seconds=rng.random() * 3600)
+        for day, hour in zip(day_picks, hour_picks)
+    ]
+    times.sort()
+    return times
+
+
+def generate(database_name: str, args):
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    engine = create_engine(f"sqlite:///./{database_name}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # Bulk load: a crash mid-way may lose the generated rows, never existing data integrity
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        started = time.perf_counter()
+
+        # Building indexes once at the end is much faster than updating them per row
+        index_statements = drop_indexes(cursor, ["dishes", "persons", "orders", "order_items", "order_events", "feedback"])
+
+        # Dishes
+        first_dish = next_id(cursor, "dishes")
+        opened = now - timedelta(days=args.days)
+        created = timestamp(opened)
+        prices = [round(rng.uniform(2.5, 30), 2) for _ in range(args.dishes)]
+        insert(cursor, "dishes",
+               ["id", "name", "description", "category", "price", "quantity", "discount",
+                "is_offer", "is_special", "visibility", "created_at", "updated_at"],
+               ((first_dish + index, f"{CATEGORIES[index % len(CATEGORIES)]} Dish {first_dish + index}",
+                 "Synthetic dish for scale testing", CATEGORIES[index % len(CATEGORIES)], prices[index], 1000,
+                 0, int(rng.random() < 0.05), int(rng.random() < 0.03), int(rng.random() > 0.02),
+                 created, created)
+                for index in range(args.dishes)))
+        # Popularity follows dish rank, shuffled so it is not tied to id
+        dish_ranks = list(range(args.dishes))
+        rng.shuffle(dish_ranks)
+        dish_weights = zipf_cumulative(args.dishes)
+
+        # Tables
+        cursor.execute("SELECT COALESCE(MAX(table_number), 0) FROM tables")
+        first_table = cursor.fetchone()[0] + 1
+        insert(cursor, "tables", ["table_number", "is_occupied", "created_at", "updated_at"],
+               ((first_table + index, 0, created, created) for index in range(args.tables)))
+        table_numbers = list(range(first_table, first_table + args.tables))
+
+        # Orders, items and events; persons are written afterwards with their visit counts
+        first_person = next_id(cursor, "persons")
+        person_weights = zipf_cumulative(args.persons, 0.8) if args.persons else None
+        visits = [0] * args.persons
+        last_visit = [None] * args.persons
+
+        first_order = next_id(cursor, "orders")
+        first_item = next_id(cursor, "order_items")
+        times = order_times(rng, args.orders, args.days, now)
+        orders, items, events, paid_orders = [], [], [], []
+        # 1 + floor of an exponential draw averages args.items items per order
+        item_scale = max(args.items - 0.5, 0.1)
+        item_id = first_item
+
+        # Local names: this loop runs once per order
+        random_value, uniform, bisect_right = rng.random, rng.uniform, bisect.bisect_right
+        person_total = person_weights[-1] if person_weights else 0
+        dish_total = dish_weights[-1]
+
+        for index, placed in enumerate(times):
+            order_id = first_order + index
+            person = None
+            if person_weights and random_value() < 0.85:
+                person = bisect_right(person_weights, random_value() * person_total)
+
+            # Recent orders are still moving through the kitchen
+            age = (now - placed).total_seconds() / 60
+            placed_at = timestamp(placed)
+            status, elapsed = "pending", 0.0
+            transitions = [(status, placed_at)]
+            for next_status in ("accepted", "completed", "paid"):
+                elapsed += uniform(*STATUS_MINUTES[status])
+                if elapsed > age:
+                    break
+                status = next_status
+                transitions.append((status, timestamp(placed + timedelta(minutes=elapsed))))
+            if status == "pending" and age > 60 and random_value() < 0.5:
+                status = "cancelled"
+                transitions.append((status, timestamp(placed + timedelta(minutes=uniform(1, 10)))))
+
+            total, count = 0.0, 0
+            for _ in range(1 + int(rng.expovariate(1 / item_scale))):
+                dish = dish_ranks[bisect_right(dish_weights, random_value() * dish_total)]
+                quantity = 1 if random_value() < 0.75 else rng.randint(2, 4)
+                items.append((item_id, order_id, first_dish + dish, quantity, prices[dish], placed_at))
+                item_id += 1
+                total += quantity * prices[dish]
+                count += quantity
+
+            updated_at = transitions[-1][1]
+            person_id = None
+            if person is not None:
+                person_id = first_person + person
+                visits[person] += 1
+                last_visit[person] = placed
+            orders.append((order_id, table_numbers[int(random_value() * len(table_numbers))],
+                           f"table-{order_id % 997}", person_id, status, round(total, 2), count,
+                           placed_at, updated_at))
+            events.extend((order_id, event_status, at) for event_status, at in transitions)
+            if status == "paid":
+                paid_orders.append((order_id, person_id, updated_at))
+
+            if len(orders) >= BATCH_SIZE:
+                flush_orders(cursor, orders, items, events)
+
+        flush_orders(cursor, orders, items, events)
+
+        # Persons, with the visits generated above
+        insert(cursor, "persons",
+               ["id", "username", "password", "phone_number", "visit_count", "last_visit", "created_at"],
+               ((first_person + index, f"guest{first_person + index}", "password",
+                 f"+1555{first_person + index:07d}" if index % 3 == 0 else None, visits[index],
+                 timestamp(last_visit[index] or opened), created)
+                for index in range(args.persons)))
+
+        # Feedback for a sample of paid orders, leaning positive
+        feedback = rng.sample(paid_orders, min(args.feedback, len(paid_orders)))
+        insert(cursor, "feedback", ["order_id", "person_id", "rating", "comment", "created_at"],
+               ((order_id, person_id, rng.choices([1, 2, 3, 4, 5], weights=[3, 4, 12, 38, 43])[0],
+                 rng.choice(COMMENTS), timestamp(datetime.fromisoformat(paid_at) + timedelta(minutes=rng.uniform(1, 20))))
+                for order_id, person_id, paid_at in feedback))
+
+        for statement in index_statements:
+            cursor.execute(statement)
+
+        connection.commit()
+        print(f"{database_name}: {args.dishes} dishes, {args.tables} tables, {args.persons} persons, "
+              f"{args.orders} orders, {item_id - first_item} items, {len(feedback)} feedback rows "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        connection.close()
+        engine.dispose()
+
+
+def flush_orders(cursor, orders: list, items: list, events: list):
+    """Write a batch of generated orders with their items and events"""
+    insert(cursor, "orders",
+           ["id", "table_number", "unique_id", "person_id", "status", "total_amount", "item_count",
+            "created_at", "updated_at"], orders)
+    insert(cursor, "order_items", ["id", "order_id", "dish_id", "quantity", "unit_price", "created_at"], items)
+    insert(cursor, "order_events", ["order_id", "status", "created_at"], events)
+    orders.clear()
+    items.clear()
+    events.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a tenant database with synthetic data")
+    parser.add_argument("database", help="database file, e.g. anifa.db (created if missing)")
+    parser.add_argument("--dishes", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--items", type=float, default=2.5, help="mean items per order")
+    parser.add_argument("--persons", type=int, default=50000)
+    parser.add_argument("--feedback", type=int, default=20000)
+    parser.add_argument("--tables", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365, help="spread orders over this many past days")
+    parser.add_argument("--seed", type=int, default=1, help="random seed, for reproducible data")
+    args = parser.parse_args()
+
+    if args.dishes < 1 or args.tables < 1 or args.days < 1:
+        parser.error("--dishes, --tables and --days must be at least 1")
+
+    generate(args.database, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Text assets worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".ico"}
+MIN_SIZE = 1024
+
+
+def is_up_to_date(source_path, target_path):
+    return os.path.exists(target_path) and os.path.getmtime(target_path) >= os.path.getmtime(source_path)
+
+
+def compress_file(path):
+    """Write path.gz (and path.br when brotli is installed); returns the number written"""
+    with open(path, "rb") as file:
+        data = file.read()
+
+    written = 0
+    if not is_up_to_date(path, path + ".gz"):
+        with open(path + ".gz", "wb") as file:
+            file.write(gzip.compress(data, compresslevel=9, mtime=0))
+        written += 1
+    if brotli and not is_up_to_date(path, path + ".br"):
+        with open(path + ".br", "wb") as file:
+            file.write(brotli.compress(data, quality=11))
+        written += 1
+    return written
+
+
+def precompress_directory(directory):
+    """Precompress every text asset under directory"""
+    if not os.path.isdir(directory):
+        print(f"Skipping {directory}: not a directory")
+        return
+
+    files = 0
+    written = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if os.path.getsize(path) < MIN_SIZE:
+                continue
+            files += 1
+            written += compress_file(path)
+
+    print(f"{directory}: {files} files, {written} compressed copies written")
+
+
+def main():
+    # Precompress the directories given on the command line, or the React build
+    directories = sys.argv[1:] or ["frontend/build"]
+
+    if brotli is None:
+        print("brotli is not installed, writing .gz files only")
+
+    for directory in directories:
+        precompress_directory(directory)
+
+
+if __name__ == "__main__":
+    main()
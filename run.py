@@ -1,7 +1,24 @@
-import uvicorn
+"""
+Start the Tabble server.
+
+Development (default): a single process with auto-reload, announcing the
+address other devices on the network can use.
+
+Production (--production or TABBLE_ENV=production): several worker
+processes sharing the port, uvloop and httptools when installed
+(`pip install uvloop httptools`), no reload, tuned keep-alive and backlog,
+graceful shutdown that lets in-flight requests finish, and a warm-up in
+each worker before it takes traffic. Every option can also be set through
+the environment variable shown in --help.
+"""
+import argparse
+import csv
+import importlib.util
 import os
 import socket
 
+import uvicorn
+
 
 def get_ip_address():
     """Get the local IP address of the machine."""
@@ -18,21 +35,120 @@ def get_ip_address():
         return "127.0.0.1"  # Return localhost if there's an error
 
 
-if __name__ == "__main__":
-    # Create static/images directory if it doesn't exist
-    os.makedirs("app/static/images", exist_ok=True)
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def env_int(name: str, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Tabble server")
+    parser.add_argument("--production", action="store_true",
+                        default=os.getenv("TABBLE_ENV", "").lower() == "production",
+                        help="multi-worker server without reload (TABBLE_ENV=production)")
+    parser.add_argument("--host", default=os.getenv("TABBLE_HOST", "0.0.0.0"), help="TABBLE_HOST")
+    parser.add_argument("--port", type=int, default=env_int("TABBLE_PORT", 8000), help="TABBLE_PORT")
+    parser.add_argument("--workers", type=int, default=env_int("TABBLE_WORKERS", os.cpu_count() or 1),
+                        help="worker processes in production, default one per core (TABBLE_WORKERS)")
+    # Longer than the idle timeout of common load balancers (60s), so they never reuse a closed connection
+    parser.add_argument("--keep-alive", type=int, default=env_int("TABBLE_KEEP_ALIVE", 75),
+                        help="seconds an idle keep-alive connection stays open (TABBLE_KEEP_ALIVE)")
+    parser.add_argument("--backlog", type=int, default=env_int("TABBLE_BACKLOG", 2048),
+                        help="connections queued by the kernel before accept (TABBLE_BACKLOG)")
+    # Longer than the longest long poll (TABBLE_LONG_POLL_MAX_WAIT), so waiting clients get their answer
+    parser.add_argument("--graceful-timeout", type=int, default=env_int("TABBLE_GRACEFUL_TIMEOUT", 35),
+                        help="seconds to let in-flight requests finish on shutdown (TABBLE_GRACEFUL_TIMEOUT)")
+    parser.add_argument("--limit-concurrency", type=int, default=env_int("TABBLE_LIMIT_CONCURRENCY", None),
+                        help="answer 503 beyond this many connections per worker (TABBLE_LIMIT_CONCURRENCY)")
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("TABBLE_FORWARDED_ALLOW_IPS", "127.0.0.1"),
+                        help="proxies trusted for X-Forwarded-* headers (TABBLE_FORWARDED_ALLOW_IPS)")
+    return parser.parse_args()
+
+
+def prepare_databases():
+    """
+    Create and upgrade every hotel database once, before the workers start.
+
+    Workers also create missing tables and columns when they open a
+    database; doing it here first keeps several of them from racing on the
+    same fresh or outdated file.
+    """
+    from sqlalchemy import create_engine
+    from app.database import Base, upgrade_schema
 
-    # Check for force reset flag
+    with open("hotels.csv", newline="") as file:
+        names = [row["hotel_database"] for row in csv.DictReader(file)]
 
+    for name in dict.fromkeys(["tabble_new.db", *names]):
+        engine = create_engine(f"sqlite:///./{name}")
+        try:
+            Base.metadata.create_all(bind=engine)
+            upgrade_schema(engine)
+        finally:
+            engine.dispose()
+
+
+def run_development(args):
     # Get the IP address
     ip_address = get_ip_address()
 
     # Display access information
     print("\n" + "=" * 50)
 
-    print(f"Access from other devices at: http://{ip_address}:8000")
+    print(f"Access from other devices at: http://{ip_address}:{args.port}")
     print("=" * 50 + "\n")
 
     # Run the application on your IP address
     # Using 0.0.0.0 allows connections from any IP
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+
+
+def run_production(args):
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+
+    # Read by each worker at startup; workers inherit the environment
+    os.environ.setdefault("TABBLE_WARM_UP", "1")
+    if args.workers > 1:
+        # A session must map to the same hotel whichever worker serves it
+        os.environ.setdefault("TABBLE_SESSION_STORE", "sqlite")
+        # Writes handled by one worker invalidate the caches of the others
+        os.environ.setdefault("TABBLE_CACHE_BUS", "1")
+
+    prepare_databases()
+
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers "
+          f"(loop={loop}, http={http}, keep-alive={args.keep_alive}s, backlog={args.backlog})")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        reload=False,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=args.limit_concurrency,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        server_header=False,
+        # Every request is already logged as JSON by the timing middleware (TABBLE_REQUEST_LOG)
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    # Create static/images directory if it doesn't exist
+    os.makedirs("app/static/images", exist_ok=True)
+
+    args = parse_args()
+    if args.production:
+        run_production(args)
+    else:
+        run_development(args)